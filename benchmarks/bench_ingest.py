@@ -0,0 +1,120 @@
+"""
+Cost of turning a hub page's links into frontier entries.
+
+Builds pages with 1,000 to 20,000 links (half of them repeats, as nav bars
+and pagers produce) and times the two ingestion stages against the former
+per-link code:
+
+- extract: hrefs to absolute URLs (_extract_links), formerly one tree walk
+  per tag and every repeated href normalized again
+- admit: the batched filter (Crawler._admit), formerly an asset check,
+  urlparse, allowlist, rules and seen-set lookup per link
+
+    python benchmarks/bench_ingest.py
+"""
+
+from __future__ import annotations
+
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from openai_url_harvester.crawl import (  # noqa: E402
+    CrawlConfig,
+    Crawler,
+    _extract_links,
+)
+from openai_url_harvester.rules import UrlRules  # noqa: E402
+from openai_url_harvester.utils import (  # noqa: E402
+    is_probably_html,
+    norm_url,
+)
+
+SIZES = (1_000, 5_000, 20_000)
+BASE = "https://www.example.com/hub"
+
+
+def make_soup(n: int) -> BeautifulSoup:
+    """A page with n links, each href appearing twice."""
+    anchors = "".join(
+        f'<a href="/docs/s{i % 50}/p{i}.html">{i}</a>'
+        f'<a href="/docs/s{i % 50}/p{i}.html">again</a>'
+        for i in range(n // 2)
+    )
+    return BeautifulSoup(f"<html><body>{anchors}</body></html>", "html.parser")
+
+
+def make_crawler(seen: list[str]) -> Crawler:
+    """A crawler with an allowlist, rules and a third of the links seen."""
+    crawler = Crawler(
+        CrawlConfig(
+            start_urls=[],
+            allow_hosts={"example.com"},
+            max_depth=5,
+            rules=UrlRules.parse(["+host:*.example.com", "-path:/private/"]),
+        )
+    )
+    crawler.enqueued.update(seen[::3])
+    return crawler
+
+
+def extract_per_link(soup: BeautifulSoup) -> list[str]:
+    """The former extraction."""
+    links = []
+    for tag, attr in (
+        ("a", "href"),
+        ("link", "href"),
+        ("script", "src"),
+        ("img", "src"),
+    ):
+        for t in soup.find_all(tag):
+            u = norm_url(BASE, t.get(attr))
+            if u:
+                links.append(u)
+    return links
+
+
+def admit_per_link(crawler: Crawler, links: list[str]) -> list[str]:
+    """The former filter loop."""
+    links = [u for u in links if is_probably_html(u)]
+    return [u for u in dict.fromkeys(links) if crawler._wanted(u, 1)]
+
+
+def best_ms(fn, *args) -> float:
+    """Best-of-3 milliseconds per call."""
+    best = float("inf")
+    for _ in range(3):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+
+def main() -> None:
+    """Print a table of ingestion cost by page size."""
+    print(
+        f"{'links':>8} {'extract ms':>16} {'admit ms':>16}"
+        f"\n{'':>8} {'before':>8}{'after':>8} {'before':>8}{'after':>8}"
+    )
+    for n in SIZES:
+        soup = make_soup(n)
+        links = extract_per_link(soup)
+        crawler = make_crawler(links)
+        assert admit_per_link(crawler, links) == crawler._admit(
+            _extract_links(BASE, soup), 1
+        )
+        print(
+            f"{n:>8} "
+            f"{best_ms(extract_per_link, soup):>8.1f}"
+            f"{best_ms(_extract_links, BASE, soup):>8.1f} "
+            f"{best_ms(admit_per_link, crawler, links):>8.1f}"
+            f"{best_ms(crawler._admit, links, 1):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
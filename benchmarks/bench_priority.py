@@ -0,0 +1,119 @@
+"""
+Useful pages per fetched page under a fixed budget: FIFO vs best-first.
+
+Simulates crawls over a synthetic site graph (no network): a few hub
+pages that most pages link to, a long tail of rarely linked pages, and
+pagination chains that keep producing new low-value URLs. A page counts as
+useful if it is among the 5% most linked-to pages of the whole graph.
+Each frontier crawls the same graph with the same page budget; the
+best-first one also runs with a small memory limit to show the spilled
+variant keeps the same ordering.
+
+    python benchmarks/bench_priority.py [--pages 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import pathlib
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from openai_url_harvester.frontier import (  # noqa: E402
+    FrontierBackend,
+    MemoryFrontier,
+)
+from openai_url_harvester.priority import (  # noqa: E402
+    PriorityFrontier,
+    build_scorer,
+)
+
+BUDGETS = (0.02, 0.05, 0.1)
+
+
+def make_graph(n: int, rng: random.Random) -> dict[str, list[str]]:
+    """Page -> outlinks, with skewed (Zipf-like) link targets."""
+    pages = [f"/p{i}" for i in range(n)]
+    weights = [1.0 / (i + 1) for i in range(n)]
+    graph: dict[str, list[str]] = {}
+    for i, page in enumerate(pages):
+        links = rng.choices(pages, weights=weights, k=8)
+        links += [pages[rng.randrange(n)] for _ in range(4)]
+        # Pagination: a chain of listing pages nobody else links to.
+        links.append(f"/list{i}?page=2")
+        graph[page] = links
+        for k in range(2, 6):
+            graph[f"/list{i}?page={k}"] = [
+                f"/list{i}?page={k + 1}",
+                pages[rng.randrange(n)],
+            ]
+    graph["/"] = pages[:20] + [f"/list{i}?page=2" for i in range(20)]
+    return graph
+
+
+async def crawl(
+    frontier: FrontierBackend, graph: dict[str, list[str]], budget: int
+) -> list[str]:
+    """Fetch up to budget pages best-first from "/"; return them in order."""
+    seen: set[str] = set()
+    fetched: list[str] = []
+    await frontier.add([("/", 0, None)])
+    seen.add("/")
+    while len(fetched) < budget:
+        item = await frontier.pop()
+        if item is None:
+            break
+        url, depth, _ = item
+        fetched.append(url)
+        await frontier.done(url)
+        links = list(dict.fromkeys(graph.get(url, ())))
+        again = seen.intersection(links)
+        if again:
+            await frontier.link_seen(again)
+        new = [u for u in links if u not in seen]
+        seen.update(new)
+        await frontier.add([(u, depth + 1, url) for u in new])
+    await frontier.close()
+    return fetched
+
+
+def main() -> None:
+    """Print the share of useful pages among those fetched, per budget."""
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=50_000)
+    args = ap.parse_args()
+    graph = make_graph(args.pages, random.Random(3))
+    indegree = Counter(u for links in graph.values() for u in set(links))
+    top = {u for u, _ in indegree.most_common(len(graph) // 20)}
+    scorer = build_scorer("depth:0.5,inlinks:2")
+
+    print(
+        f"{'budget':>8} {'fifo':>7} {'best-first':>11} "
+        f"{'spilled':>8} {'spilled s':>10}"
+    )
+    for share in BUDGETS:
+        budget = int(len(graph) * share)
+        fifo = asyncio.run(crawl(MemoryFrontier(), graph, budget))
+        best = asyncio.run(crawl(PriorityFrontier(scorer), graph, budget))
+        t0 = time.perf_counter()
+        spilled = asyncio.run(
+            crawl(PriorityFrontier(scorer, max_entries=2_000), graph, budget)
+        )
+        elapsed = time.perf_counter() - t0
+
+        def useful(pages: list[str]) -> str:
+            return f"{sum(p in top for p in pages) / len(pages):.0%}"
+
+        print(
+            f"{budget:>8} {useful(fifo):>7} {useful(best):>11} "
+            f"{useful(spilled):>8} {elapsed:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Per-link cost of compiled URL rules as the rule count grows.
+
+Builds rule sets mixing host, host-suffix, host-glob, path-prefix, regex
+and query rules, then times UrlRules.allows() over a fixed set of links.
+A naive evaluator (every rule tried in turn) is timed alongside for
+comparison at the smaller sizes.
+
+    python benchmarks/bench_rules.py [--links 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import pathlib
+import random
+import re
+import sys
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from openai_url_harvester.rules import UrlRules  # noqa: E402
+
+SIZES = (10, 100, 1_000, 10_000)
+NAIVE_MAX = 1_000
+
+
+def make_rules(n: int, rng: random.Random) -> list[str]:
+    """n rules, roughly evenly split across the rule kinds."""
+    lines = ["+host:*.example.com"]
+    for i in range(n - 1):
+        kind = i % 6
+        if kind == 0:
+            lines.append(f"-host:h{i}.example.com")
+        elif kind == 1:
+            lines.append(f"-host:*.zone{i}.example.com")
+        elif kind == 2:
+            lines.append(f"-host:cdn{i}-*.example.com")
+        elif kind == 3:
+            lines.append(f"-path:/section{i}/private/")
+        elif kind == 4:
+            lines.append(f"-re:/archive{i}/\\d{{4}}/")
+        else:
+            lines.append(f"-query:token{i}")
+    rng.shuffle(lines)
+    return lines
+
+
+def make_links(n: int, rng: random.Random) -> list[str]:
+    """Links over a mix of hosts, paths and query strings."""
+    links = []
+    for _ in range(n):
+        i = rng.randrange(20_000)
+        host = rng.choice(
+            [f"h{i}.example.com", f"a.zone{i}.example.com", "www.example.com"]
+        )
+        path = rng.choice(
+            [
+                f"/section{i}/private/page",
+                f"/archive{i}/2024/07/post",
+                f"/docs/guide/{i}",
+            ]
+        )
+        query = rng.choice(["", f"?token{i}=x", "?page=2"])
+        links.append(f"https://{host}{path}{query}")
+    return links
+
+
+def naive(lines: list[str]):
+    """Reference evaluator that tries every rule for every link."""
+    parsed = []
+    for line in lines:
+        kind, value = line[1:].split(":", 1)
+        if kind == "re":
+            parsed.append((line[0], kind, re.compile(value)))
+        else:
+            parsed.append((line[0], kind, value))
+
+    def allows(url: str) -> bool:
+        p = urlparse(url)
+        host = p.hostname or ""
+        inc = False
+        for sign, kind, value in parsed:
+            if kind == "host":
+                hit = fnmatch.fnmatch(host, value)
+            elif kind == "path":
+                hit = p.path.startswith(value)
+            elif kind == "re":
+                hit = bool(value.search(url))
+            else:
+                hit = value in p.query
+            if hit and sign == "-":
+                return False
+            inc = inc or (hit and sign == "+")
+        return inc
+
+    return allows
+
+
+def per_link_us(fn, links: list[str]) -> float:
+    """Best-of-3 average microseconds per call."""
+    best = float("inf")
+    for _ in range(3):
+        t0 = time.perf_counter()
+        for u in links:
+            fn(u)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(links) * 1e6
+
+
+def main() -> None:
+    """Print a table of per-link cost by rule count."""
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--links", type=int, default=20_000)
+    args = ap.parse_args()
+    rng = random.Random(7)
+    links = make_links(args.links, rng)
+
+    print(
+        f"{'rules':>8} {'compile ms':>11} {'us/link':>9} "
+        f"{'naive us/link':>14}"
+    )
+    for n in SIZES:
+        lines = make_rules(n, rng)
+        t0 = time.perf_counter()
+        rules = UrlRules.parse(lines)
+        compile_ms = (time.perf_counter() - t0) * 1e3
+        compiled = per_link_us(rules.allows, links)
+        ref = (
+            f"{per_link_us(naive(lines), links[:2000]):14.1f}"
+            if n <= NAIVE_MAX
+            else f"{'-':>14}"
+        )
+        print(f"{n:>8} {compile_ms:>11.1f} {compiled:>9.2f} {ref}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+CLI startup budget check.
+
+Imports ``openai_url_harvester.__main__`` under ``python -X importtime`` a
+few times and fails if the best cumulative import time exceeds the budget
+or if any heavy dependency is loaded eagerly.
+
+    python benchmarks/bench_startup.py [--budget-ms 60] [--runs 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+import subprocess
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+TARGET = "openai_url_harvester.__main__"
+HEAVY = ("aiohttp", "aiolimiter", "bs4", "chardet", "pdfminer", "asyncio")
+
+
+def _importtime(code: str) -> list[str]:
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    return [
+        line
+        for line in proc.stderr.splitlines()
+        if line.startswith("import time:") and line.count("|") == 2
+    ]
+
+
+def measure() -> tuple[int, set[str]]:
+    """Return (cumulative import time in us, top-level modules imported)."""
+    # Interpreter start-up (site, encodings) is logged first; skip as many
+    # rows as an empty program produces.
+    skip = len(_importtime("pass"))
+    total = 0
+    modules: set[str] = set()
+    for line in _importtime(f"import {TARGET}")[skip:]:
+        _, cumulative, raw = line.split("|")
+        name = raw.strip()
+        modules.add(name.split(".")[0])
+        if raw[:2] == " " + name[0]:  # not nested under another import
+            total += int(cumulative)
+    return total, modules
+
+
+def main() -> int:
+    """Run the check and return a process exit code."""
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--budget-ms", type=float, default=60.0)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    best = None
+    loaded: set[str] = set()
+    for _ in range(args.runs):
+        us, modules = measure()
+        best = us if best is None else min(best, us)
+        loaded |= modules
+    assert best is not None
+    eager = sorted(loaded & set(HEAVY))
+    print(f"{TARGET}: {best / 1000:.1f} ms (budget {args.budget_ms} ms)")
+    if eager:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(eager)}")
+        return 1
+    if best / 1000 > args.budget_ms:
+        print("FAIL: import time over budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
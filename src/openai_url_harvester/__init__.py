@@ -1,6 +1,19 @@
 """
 openai_url_harvester package initialization.
+
+The embeddable crawler API (``Crawler``, ``CrawlConfig``, ``CrawlPage``) is
+re-exported lazily so importing the package stays cheap.
 """
 
 # SPDX-License-Identifier: Apache-2.0
-__all__ = []
+from typing import Any
+
+__all__ = ["CrawlConfig", "CrawlPage", "Crawler"]
+
+
+def __getattr__(name: str) -> Any:
+    if name in __all__:
+        from . import crawl
+
+        return getattr(crawl, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,30 +1,59 @@
 """
 Main entry point for openai_url_harvester CLI.
-Provides commands for crawling and extracting URLs.
+Provides commands for crawling and extracting URLs, plus a persistent
+``serve`` mode and a ``submit`` client for it.
+
+Each subcommand imports its heavy dependencies (aiohttp, bs4, pdfminer)
+only when it runs, so startup stays fast.
 """
 
 from __future__ import annotations
 
 import argparse
-import asyncio
+import os
 import sys
-from typing import Sequence
-
+from typing import Any, Coroutine, Sequence
 
-# Third-party imports (if needed in this file)
-# import aiohttp
-# from aiohttp import ClientTimeout
-# from aiolimiter import AsyncLimiter
-# from bs4 import BeautifulSoup
+from .utils import DEFAULT_UA
 
-from .crawl import run_crawl, DEFAULT_UA
-from .extract import extract_from_files, save_json, save_list
+# Path-valued options, resolved against the submitting client's cwd when a
+# job runs inside the server.
+PATH_OPTIONS = (
+    "out",
+    "details_out",
+    "cache_html",
+    "export_json",
+    "sitemap_out",
+    "checkpoint",
+    "state",
+    "diff_out",
+    "json_out",
+    "path",
+    "rules",
+    "inputs",
+    "details",
+    "url_weights",
+)
 
 
 def _bool(v: str) -> bool:
     return str(v).lower() in {"1", "true", "t", "yes", "y", "on"}
 
 
+def _add_server_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--socket",
+        default=None,
+        help="Unix socket path (default: a per-user socket)",
+    )
+    p.add_argument(
+        "--port", type=int, default=None, help="Use TCP on this port instead"
+    )
+    p.add_argument(
+        "--host", default="127.0.0.1", help="TCP host; loopback only"
+    )
+
+
 def build_parser() -> argparse.ArgumentParser:
     """
     Build and return the argument parser for the openai_url_harvester CLI.
@@ -40,6 +69,12 @@ def build_parser() -> argparse.ArgumentParser:
         default=[],
         help="Allowed domains (subdomains allowed)",
     )
+    c.add_argument(
+        "--rules",
+        nargs="*",
+        default=[],
+        help="Rule files of +/- host:, path:, url:, re:, query: lines",
+    )
     c.add_argument("--max-pages", type=int, default=5000)
     c.add_argument("--depth", type=int, default=None)
     c.add_argument("--concurrency", type=int, default=20)
@@ -69,6 +104,104 @@ def build_parser() -> argparse.ArgumentParser:
     c.add_argument(
         "--export-json", default=None, help="Write JSON dump of URLs"
     )
+    c.add_argument(
+        "--near-dup-distance",
+        type=int,
+        default=3,
+        help="SimHash bit distance treated as duplicate content (-1 disables)",
+    )
+    c.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="Retries for DNS/connect/timeout/429/5xx failures",
+    )
+    c.add_argument(
+        "--retry-base-delay",
+        type=float,
+        default=1.0,
+        help="Initial retry backoff in seconds (doubles per attempt)",
+    )
+    c.add_argument(
+        "--breaker-threshold",
+        type=int,
+        default=5,
+        help="Consecutive failures before a host is paused",
+    )
+    c.add_argument(
+        "--time-budget",
+        type=float,
+        default=None,
+        help="Stop the crawl after this many seconds",
+    )
+    c.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Save unfinished frontier here on stop; resume from it later",
+    )
+    c.add_argument(
+        "--sitemaps",
+        type=str,
+        default="false",
+        help="true/false seed from robots.txt Sitemap: and /sitemap.xml",
+    )
+    c.add_argument(
+        "--max-sitemaps",
+        type=int,
+        default=50,
+        help="Max sitemap files (including index parts) to read",
+    )
+    c.add_argument(
+        "--state",
+        default=None,
+        help="Crawl state JSON shared between runs (skips unchanged pages)",
+    )
+    c.add_argument(
+        "--recrawl",
+        type=str,
+        default="false",
+        help="true/false revisit --state URLs on adaptive schedules",
+    )
+    c.add_argument(
+        "--diff-out",
+        default=None,
+        help="Write added/changed/removed URLs vs. --state as JSON",
+    )
+    c.add_argument(
+        "--frontier",
+        default=None,
+        help="Shared frontier: sqlite:///file.db or redis://host:6379/0 "
+        "(default: in memory)",
+    )
+    c.add_argument(
+        "--node-id",
+        default=None,
+        help="Name of this node in a shared crawl (default: hostname-pid)",
+    )
+    c.add_argument(
+        "--lease-ttl",
+        type=float,
+        default=30.0,
+        help="Seconds a node's host lease lasts without renewal",
+    )
+    c.add_argument(
+        "--priority",
+        default=None,
+        help="Fetch best-scored URLs first, e.g. depth,inlinks:2,sitemap,"
+        "patterns (default: first-in-first-out)",
+    )
+    c.add_argument(
+        "--url-weights",
+        nargs="*",
+        default=[],
+        help="Files of 'weight regex' lines for the 'patterns' scorer",
+    )
+    c.add_argument(
+        "--frontier-memory",
+        type=int,
+        default=100_000,
+        help="Queued URLs kept in memory before low scorers spill to disk",
+    )
 
     # Sitemap options (auto-chunk and optional gzip)
     c.add_argument(
@@ -87,6 +220,25 @@ def build_parser() -> argparse.ArgumentParser:
         help="true/false gzip sitemap files",
     )
 
+    m = sub.add_parser(
+        "merge", help="Merge the outputs of several crawler nodes"
+    )
+    m.add_argument(
+        "--inputs",
+        nargs="+",
+        required=True,
+        help="URL lists (.txt) or JSON exports written by each node",
+    )
+    m.add_argument("--out", required=True)
+    m.add_argument(
+        "--details", nargs="*", default=[], help="Per-node details CSVs"
+    )
+    m.add_argument("--details-out", default=None)
+    m.add_argument("--export-json", default=None)
+    m.add_argument("--sitemap-out", default=None)
+    m.add_argument("--sitemap-max-urls", type=int, default=50000)
+    m.add_argument("--sitemap-gzip", type=str, default="false")
+
     e = sub.add_parser("extract", help="Extract URLs from local files")
     e.add_argument(
         "--path", nargs="+", required=True, help="Files or directories"
@@ -94,9 +246,126 @@ def build_parser() -> argparse.ArgumentParser:
     e.add_argument("--out", required=True)
     e.add_argument("--json-out", default=None)
 
+    s = sub.add_parser(
+        "serve", help="Run a persistent server that executes submitted jobs"
+    )
+    _add_server_args(s)
+
+    j = sub.add_parser(
+        "submit", help="Run a crawl/extract job on a running server"
+    )
+    _add_server_args(j)
+    j.add_argument(
+        "job",
+        nargs=argparse.REMAINDER,
+        help="Job arguments, e.g. -- extract --path docs --out urls.txt",
+    )
+
     return p
 
 
+def crawl_job(
+    args: argparse.Namespace, handle_signals: bool = True
+) -> Coroutine[Any, Any, str]:
+    """Return a coroutine running the crawl command; yields its message."""
+    from .crawl import run_crawl
+    from .priority import UrlWeights, build_scorer
+    from .rules import UrlRules
+
+    rules = UrlRules.load(args.rules) if args.rules else None
+    priority = (
+        build_scorer(
+            args.priority,
+            UrlWeights.load(args.url_weights) if args.url_weights else None,
+        )
+        if args.priority
+        else None
+    )
+
+    async def job() -> str:
+        urls = await run_crawl(
+            start_urls=args.start,
+            allow_hosts=set(a.lower() for a in args.allow),
+            max_pages=args.max_pages,
+            max_depth=args.depth,
+            concurrency=args.concurrency,
+            per_host_qps=args.per_host_qps,
+            delay=args.delay,
+            user_agent=args.user_agent,
+            request_timeout=args.request_timeout,
+            respect_robots=_bool(args.respect_robots),
+            include_assets=_bool(args.include_assets),
+            out_path=args.out,
+            details_path=args.details_out,
+            cache_html_dir=args.cache_html,
+            export_json_path=args.export_json,
+            sitemap_out=args.sitemap_out,
+            sitemap_max_urls=args.sitemap_max_urls,
+            sitemap_gzip=_bool(args.sitemap_gzip),
+            near_dup_distance=(
+                args.near_dup_distance if args.near_dup_distance >= 0 else None
+            ),
+            max_retries=args.max_retries,
+            retry_base_delay=args.retry_base_delay,
+            breaker_threshold=args.breaker_threshold,
+            time_budget=args.time_budget,
+            checkpoint_path=args.checkpoint,
+            sitemaps=_bool(args.sitemaps),
+            max_sitemaps=args.max_sitemaps,
+            state_path=args.state,
+            recrawl=_bool(args.recrawl),
+            diff_out=args.diff_out,
+            rules=rules,
+            handle_signals=handle_signals,
+            frontier=args.frontier,
+            node_id=args.node_id,
+            lease_ttl=args.lease_ttl,
+            priority=priority,
+            frontier_memory=args.frontier_memory,
+        )
+        return f"Wrote {len(urls)} URLs to {args.out}"
+
+    return job()
+
+
+def extract_job(args: argparse.Namespace) -> str:
+    """Run the extract command and return its message."""
+    from .extract import extract_from_files, save_json, save_list
+
+    urls = extract_from_files(args.path)
+    save_list(urls, args.out)
+    if args.json_out:
+        save_json(urls, args.json_out)
+    return f"Wrote {len(urls)} URLs to {args.out}"
+
+
+def merge_job(args: argparse.Namespace) -> str:
+    """Run the merge command and return its message."""
+    from .merge import merge_outputs
+
+    urls = merge_outputs(
+        args.inputs,
+        args.out,
+        details=args.details,
+        details_out=args.details_out,
+        export_json_path=args.export_json,
+        sitemap_out=args.sitemap_out,
+        sitemap_max_urls=args.sitemap_max_urls,
+        sitemap_gzip=_bool(args.sitemap_gzip),
+    )
+    return f"Wrote {len(urls)} URLs to {args.out}"
+
+
+def resolve_paths(args: argparse.Namespace, cwd: str) -> None:
+    """Make relative path options in args absolute against cwd."""
+    for name in PATH_OPTIONS:
+        value = getattr(args, name, None)
+        if isinstance(value, str):
+            setattr(args, name, os.path.join(cwd, value))
+        elif isinstance(value, list):
+            setattr(args, name, [os.path.join(cwd, v) for v in value])
+
+
 def main(argv: Sequence[str] | None = None) -> None:
     """
     Main CLI entry point for openai_url_harvester.
@@ -105,36 +374,34 @@ def main(argv: Sequence[str] | None = None) -> None:
     args = build_parser().parse_args(argv)
 
     if args.cmd == "crawl":
-        urls = asyncio.run(
-            run_crawl(
-                start_urls=args.start,
-                allow_hosts=set(a.lower() for a in args.allow),
-                max_pages=args.max_pages,
-                max_depth=args.depth,
-                concurrency=args.concurrency,
-                per_host_qps=args.per_host_qps,
-                delay=args.delay,
-                user_agent=args.user_agent,
-                request_timeout=args.request_timeout,
-                respect_robots=_bool(args.respect_robots),
-                include_assets=_bool(args.include_assets),
-                out_path=args.out,
-                details_path=args.details_out,
-                cache_html_dir=args.cache_html,
-                export_json_path=args.export_json,
-                sitemap_out=args.sitemap_out,
-                sitemap_max_urls=args.sitemap_max_urls,
-                sitemap_gzip=_bool(args.sitemap_gzip),
-            )
-        )
-        print(f"Wrote {len(urls)} URLs to {args.out}", file=sys.stderr)
+        import asyncio
+
+        print(asyncio.run(crawl_job(args)), file=sys.stderr)
 
     elif args.cmd == "extract":
-        urls = extract_from_files(args.path)
-        save_list(urls, args.out)
-        if args.json_out:
-            save_json(urls, args.json_out)
-        print(f"Wrote {len(urls)} URLs to {args.out}", file=sys.stderr)
+        print(extract_job(args), file=sys.stderr)
+
+    elif args.cmd == "merge":
+        print(merge_job(args), file=sys.stderr)
+
+    elif args.cmd == "serve":
+        from .serve import serve
+
+        try:
+            serve(args.host, args.port, args.socket)
+        except ValueError as exc:
+            sys.exit(f"serve: {exc}")
+
+    elif args.cmd == "submit":
+        from .serve import submit
+
+        job = list(args.job)
+        if job[:1] == ["--"]:
+            job = job[1:]
+        ok, message = submit(job, args.host, args.port, args.socket)
+        print(message, file=sys.stderr)
+        if not ok:
+            sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -8,24 +8,63 @@ from __future__ import annotations
 import json
 import asyncio
 import csv
+import inspect
 import os
-from collections import defaultdict
-from dataclasses import dataclass
+from collections import defaultdict, deque
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Iterable
+from typing import AsyncIterator, Awaitable, Callable, Iterable
 
 
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlsplit
 from urllib.robotparser import RobotFileParser
 import aiohttp
 from aiohttp import ClientTimeout
 from aiolimiter import AsyncLimiter
 from bs4 import BeautifulSoup
 
-from .sitemap import write_sitemap_auto
-from .utils import OK_CONTENT_TYPES, host_ok, is_probably_html, norm_url
-
-DEFAULT_UA = "openai-url-harvester/0.7 (+https://example.invalid)"
+from .dedup import DuplicateTracker
+from .frontier import DEFAULT_LEASE_TTL, FrontierBackend, open_frontier
+from .lifecycle import (
+    Checkpoint,
+    CrawlBudget,
+    FrontierItem,
+    load_checkpoint,
+    save_checkpoint,
+    stop_on_signals,
+)
+from .priority import PriorityFrontier, Scorer
+from .retry import (
+    CircuitBreakers,
+    DelayedQueue,
+    RetryPolicy,
+    classify_exception,
+    classify_status,
+    parse_retry_after,
+)
+from .rules import UrlRules
+from .sitemap import (
+    SitemapEntry,
+    SitemapReader,
+    parse_lastmod,
+    write_sitemap_auto,
+)
+from .state import (
+    CrawlDiff,
+    RevisitPolicy,
+    UrlState,
+    content_hash,
+    load_state,
+    save_state,
+)
+from .utils import (
+    DEFAULT_UA,
+    OK_CONTENT_TYPES,
+    host_ok,
+    is_html_path,
+    norm_url,
+)
 
 
 @dataclass(slots=True)
@@ -34,6 +73,7 @@ class RobotsState:
 
     mode: str  # "ok", "allow_all", "disallow_all"
     parser: RobotFileParser | None  # RobotFileParser or None
+    sitemaps: list[str] = field(default_factory=list)  # Sitemap: lines
 
 
 class RobotsCache:
@@ -84,7 +124,9 @@ class RobotsCache:
 
         rp = RobotFileParser()
         rp.parse(txt.splitlines())
-        return RobotsState(mode="ok", parser=rp)
+        return RobotsState(
+            mode="ok", parser=rp, sitemaps=rp.site_maps() or []
+        )
 
     # Public wrapper for external use (non-protected API)
     async def load(self, host: str, url_for_scheme: str | None) -> RobotsState:
@@ -104,20 +146,858 @@ class RobotsCache:
         return state
 
 
+@dataclass(slots=True)
+class FetchResult:
+    """Outcome of a single page fetch."""
+
+    status: int | None
+    content_type: str | None
+    text: str
+    error: str | None = None  # failure kind from retry.classify_*
+    retry_after: float | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+
+
 async def _fetch_html(
-    session: aiohttp.ClientSession, url: str, timeout: ClientTimeout
-) -> tuple[int | None, str | None, str]:
+    session: aiohttp.ClientSession,
+    url: str,
+    timeout: ClientTimeout,
+    headers: dict[str, str] | None = None,
+) -> FetchResult:
     try:
-        async with session.get(url, timeout=timeout) as r:
+        async with session.get(url, timeout=timeout, headers=headers) as r:
             ct = r.headers.get("content-type", "")
             text = (
                 await r.text(errors="ignore")
                 if any(t in (ct or "") for t in OK_CONTENT_TYPES)
                 else ""
             )
-            return r.status, ct, text
-    except (aiohttp.ClientError, asyncio.TimeoutError):
-        return None, None, ""
+            return FetchResult(
+                r.status,
+                ct,
+                text,
+                error=classify_status(r.status),
+                retry_after=parse_retry_after(r.headers.get("retry-after")),
+                etag=r.headers.get("etag"),
+                last_modified=r.headers.get("last-modified"),
+            )
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+        return FetchResult(None, None, "", error=classify_exception(exc))
+
+
+async def _fetch_sitemap(
+    session: aiohttp.ClientSession,
+    url: str,
+    timeout: ClientTimeout,
+    on_entry: Callable[[SitemapEntry], None],
+) -> None:
+    """Stream-parse one sitemap, handing entries over as they complete."""
+    reader = SitemapReader()
+    try:
+        async with session.get(url, timeout=timeout) as r:
+            if r.status >= 400:
+                return
+            async for chunk in r.content.iter_chunked(1 << 16):
+                for entry in reader.feed(chunk):
+                    on_entry(entry)
+        for entry in reader.close():
+            on_entry(entry)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return
+
+
+@dataclass
+class CrawlConfig:
+    """Settings for a Crawler; defaults match the CLI."""
+
+    start_urls: list[str]
+    allow_hosts: set[str] = field(default_factory=set)
+    rules: UrlRules | None = None  # compiled include/exclude scope rules
+    max_pages: int = 5000
+    max_depth: int | None = None
+    concurrency: int = 20
+    per_host_qps: float = 2.0
+    delay: float = 0.25
+    user_agent: str = DEFAULT_UA
+    request_timeout: int = 30
+    respect_robots: bool = True
+    include_assets: bool = False
+    near_dup_distance: int | None = 3
+    max_retries: int = 3
+    retry_base_delay: float = 1.0
+    breaker_threshold: int = 5
+    time_budget: float | None = None
+    checkpoint_path: str | None = None
+    sitemaps: bool = False  # seed from robots.txt Sitemap: and /sitemap.xml
+    max_sitemaps: int = 50  # sitemap files (incl. index parts) to read
+    state_path: str | None = None  # per-URL state shared between runs
+    recrawl: bool = False  # revisit state URLs on their own schedule
+    revisit: RevisitPolicy = field(default_factory=RevisitPolicy)
+    handle_signals: bool = False  # stop on SIGINT/SIGTERM
+    stream_buffer: int = 100  # pages held for a slow stream() consumer
+    # Shared frontier URL (sqlite:///..., redis://...); None keeps it in
+    # memory. See frontier.open_frontier.
+    frontier: str | None = None
+    node_id: str | None = None  # defaults to hostname-pid
+    lease_ttl: float = DEFAULT_LEASE_TTL  # seconds a host lease lasts
+    # Fetch the best-scored URL first (see priority.build_scorer) instead
+    # of first-in-first-out; in-memory frontier only.
+    priority: Scorer | None = None
+    frontier_memory: int = 100_000  # queued URLs held before spilling
+    spill_dir: str | None = None  # for spilled URLs; default: temp dir
+
+
+@dataclass(slots=True)
+class CrawlPage:
+    """A fetched page as yielded by Crawler.stream()."""
+
+    url: str
+    depth: int
+    referrer: str | None
+    status: int | None
+    content_type: str | None
+    text: str
+    fetched_at: str
+    links: list[str] = field(default_factory=list)  # enqueued outlinks
+    duplicate_of: str | None = None
+    # With a state_path: "added", "changed", "unchanged" or "removed".
+    change: str | None = None
+
+
+PageHook = Callable[[CrawlPage], Awaitable[None] | None]
+UrlFilter = Callable[[str], bool]
+LinkScorer = Callable[[str, CrawlPage], float | None]
+
+# (url, depth, referrer, attempt)
+_Item = tuple[str, int, str | None, int]
+
+
+class Crawler:
+    """
+    Concurrent crawler with per-host rate limiting, optional robots,
+    retries, near-duplicate pruning, and an exact page budget.
+
+    Use ``async for page in crawler.stream()`` to process pages while the
+    crawl runs, or ``await crawler.run()`` for the sorted visited URLs.
+
+    With ``sitemaps`` enabled the frontier is seeded from each start host's
+    sitemaps; with a ``state_path`` from an earlier run, sitemap URLs whose
+    ``<lastmod>`` has not moved since their last fetch are not refetched
+    and are reported in ``unchanged`` instead.
+
+    With ``recrawl`` as well, every URL in the state is revisited only when
+    its adaptive interval is due (others join ``unchanged``), refetches are
+    conditional on the stored ETag/Last-Modified, and ``diff`` lists what
+    was added, changed, or removed (404/410) since the previous run.
+
+    With a shared ``frontier`` several Crawlers (on any number of machines)
+    split one crawl: each URL is fetched by one node only, and a node
+    fetches a host only while it holds that host's lease, so per-host rate
+    limits hold across nodes. Each node keeps its own budget, visited set
+    and outputs (see merge.merge_outputs). Checkpoints only apply to the
+    in-memory frontier; shared ones persist themselves.
+
+    With a ``priority`` scorer the (in-memory) frontier is best-first: the
+    budget goes to the highest-scored queued URLs, and links found again
+    raise their target's in-link count.
+
+    Hooks:
+      - ``url_filter(url)``: return False to keep a link out of the
+        frontier (applied on top of the rules, allowlist and depth limit).
+      - ``on_page(page)``: called (and awaited if it returns an awaitable)
+        for every fetched page before it is yielded; use it for storage.
+      - ``link_scorer(url, page)``: score an outlink of page; links are
+        enqueued best-first and a score of None drops the link.
+
+    If a hook raises, the crawl stops, releases and saves its frontier as
+    for any other stop, and the error is raised from ``run``/``stream``.
+    """
+
+    def __init__(
+        self,
+        config: CrawlConfig,
+        *,
+        url_filter: UrlFilter | None = None,
+        on_page: PageHook | None = None,
+        link_scorer: LinkScorer | None = None,
+        frontier: FrontierBackend | None = None,
+    ):
+        self.config = config
+        self.url_filter = url_filter
+        self.on_page = on_page
+        self.link_scorer = link_scorer
+        self.visited: set[str] = set()
+        # URLs already offered to the frontier by this node.
+        self.enqueued: set[str] = set()
+        self._host_allowed: dict[str, bool] = {}  # netloc -> allowlist ok
+        self._owns_frontier = frontier is None
+        if frontier is None and config.priority is not None:
+            if config.frontier:
+                raise ValueError("priority needs the in-memory frontier")
+            frontier = PriorityFrontier(
+                config.priority,
+                max_entries=config.frontier_memory,
+                spill_dir=config.spill_dir,
+            )
+        self.frontier = frontier or open_frontier(
+            config.frontier, config.node_id, config.lease_ttl
+        )
+        self._wake = asyncio.Event()
+        self.dups = (
+            DuplicateTracker(max_distance=config.near_dup_distance)
+            if config.near_dup_distance is not None
+            else None
+        )
+        # One of "drained", "budget", "time", "signal", "closed" (the
+        # stream was left early) or "error" once finished.
+        self.stop_reason: str | None = None
+        self.resumed = False
+        self.unchanged: set[str] = set()
+        self.state = load_state(config.state_path)
+        self.sitemap_lastmod: dict[str, str] = {}
+        # State to save for the next run, updated as pages are fetched.
+        self.next_state: dict[str, UrlState] = dict(self.state)
+        self.diff = CrawlDiff()
+
+    async def run(self) -> list[str]:
+        """
+        Crawl to completion and return the sorted visited URLs, plus any
+        skipped as unchanged since the previous run.
+        """
+        async for _ in self.stream():
+            pass
+        return sorted(self.visited | self.unchanged)
+
+    async def stream(self) -> AsyncIterator[CrawlPage]:
+        """Yield pages as they are fetched. Leaving early stops the crawl."""
+        out: asyncio.Queue[CrawlPage | None] = asyncio.Queue(
+            self.config.stream_buffer
+        )
+        stop = asyncio.Event()
+        task = asyncio.create_task(self._crawl(out, stop))
+        try:
+            while True:
+                get = asyncio.ensure_future(out.get())
+                await asyncio.wait(
+                    (get, task), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not get.done():
+                    # The crawl died without its end marker; surface why.
+                    get.cancel()
+                    await task
+                    break
+                page = get.result()
+                if page is None:
+                    break
+                yield page
+            await task
+        finally:
+            if not task.done():
+                # Stop like any other stop, so unfinished items are released
+                # and saved; keep taking pages so the crawl never blocks on
+                # a full buffer.
+                if self.stop_reason is None:
+                    self.stop_reason = "closed"
+                stop.set()
+                try:
+                    while not task.done():
+                        get = asyncio.ensure_future(out.get())
+                        await asyncio.wait(
+                            (get, task), return_when=asyncio.FIRST_COMPLETED
+                        )
+                        get.cancel()
+                except BaseException:
+                    task.cancel()
+                    raise
+                await task
+
+    def _wanted(self, url: str, depth: int) -> bool:
+        cfg = self.config
+        return (
+            url not in self.enqueued
+            and (cfg.rules is None or cfg.rules.allows(url))
+            and host_ok(urlparse(url).netloc, cfg.allow_hosts)
+            and not (self.dups and self.dups.is_trap(url))
+            and ((cfg.max_depth is None) or (depth <= cfg.max_depth))
+            and (self.url_filter is None or self.url_filter(url))
+        )
+
+    def _admit(self, links: list[str], depth: int) -> list[str]:
+        """
+        Batch form of _wanted (plus the asset filter) for one page's links:
+        duplicates are dropped first, the seen-set is applied as one set
+        difference, and each survivor is split once for the host, asset and
+        rule checks, with host decisions cached per netloc.
+        """
+        cfg = self.config
+        if cfg.max_depth is not None and depth > cfg.max_depth:
+            return []
+        batch = dict.fromkeys(links)
+        fresh = batch.keys() - self.enqueued
+        if not fresh:
+            return []
+        allowed = self._host_allowed
+        assets = cfg.include_assets
+        rules = cfg.rules
+        kept: list[str] = []
+        for u in batch:
+            if u not in fresh:
+                continue
+            parts = urlsplit(u)
+            ok = allowed.get(parts.netloc)
+            if ok is None:
+                ok = allowed[parts.netloc] = host_ok(
+                    parts.netloc, cfg.allow_hosts
+                )
+            if (
+                ok
+                and (assets or is_html_path(parts.path))
+                and (rules is None or rules.allows_split(u, parts))
+            ):
+                kept.append(u)
+        if self.dups and self.dups.flagged:
+            kept = [u for u in kept if not self.dups.is_trap(u)]
+        if self.url_filter is not None:
+            kept = [u for u in kept if self.url_filter(u)]
+        return kept
+
+    async def _offer(self, items: list[FrontierItem]) -> list[FrontierItem]:
+        """Hand URLs to the frontier; return the ones it queued as new."""
+        enqueued = self.enqueued
+        fresh = []
+        for item in items:
+            if item[0] not in enqueued:
+                enqueued.add(item[0])
+                fresh.append(item)
+        if not fresh:
+            return []
+        added = await self.frontier.add(fresh)
+        if added:
+            self._wake.set()
+        return added
+
+    async def _crawl(
+        self, out: asyncio.Queue[CrawlPage | None], stop: asyncio.Event
+    ) -> None:
+        cfg = self.config
+        visited, dups = self.visited, self.dups
+        frontier, wake = self.frontier, self._wake
+
+        # The time budget counts from here: seeding, robots prefetch and
+        # sitemap fetches are spent from it too.
+        loop = asyncio.get_running_loop()
+        deadline = (
+            None if cfg.time_budget is None else loop.time() + cfg.time_budget
+        )
+
+        def time_left() -> float | None:
+            if deadline is None:
+                return None
+            return max(0.0, deadline - loop.time())
+
+        start_urls = list(cfg.start_urls)
+        seed: list[FrontierItem] = []
+        resumed = load_checkpoint(cfg.checkpoint_path)
+        if resumed:
+            self.resumed = True
+            visited |= resumed.visited
+            self.enqueued |= resumed.visited
+            await frontier.mark_seen(resumed.visited)
+            seed.extend(resumed.frontier)
+        seed.extend((u, 0, None) for u in start_urls)
+        await self._offer(seed)
+        if cfg.recrawl:
+            now = datetime.now(timezone.utc)
+            due: list[FrontierItem] = []
+            for u, st in self.state.items():
+                d = st.depth or 0
+                if not self._wanted(u, d):
+                    continue
+                if st.is_due(now):
+                    due.append((u, d, None))
+                else:
+                    self.unchanged.add(u)
+                    self.enqueued.add(u)
+            await frontier.mark_seen(self.unchanged)
+            await self._offer(due)
+
+        policy = RetryPolicy(
+            max_retries=cfg.max_retries, base_delay=cfg.retry_base_delay
+        )
+        breakers = CircuitBreakers(threshold=cfg.breaker_threshold)
+        retries: DelayedQueue[_Item] = DelayedQueue()
+        # Retries that are due; fetched before new frontier items.
+        ready: deque[_Item] = deque()
+        budget = CrawlBudget(cfg.max_pages, used=len(visited))
+        active = 0
+        failure: Exception | None = None
+        # Items dequeued but not finished; left over if the crawl is cut
+        # short.
+        inflight: set[_Item] = set()
+        leftover: list[_Item] = []
+
+        timeout = ClientTimeout(total=cfg.request_timeout)
+        connector = aiohttp.TCPConnector(limit=0)
+        headers = {
+            "User-Agent": cfg.user_agent,
+            "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.1",
+        }
+
+        async with aiohttp.ClientSession(
+            timeout=timeout, connector=connector, headers=headers
+        ) as session:
+            robots = RobotsCache(session, cfg.user_agent)
+
+            async def prepare() -> None:
+                # Prefetch robots.txt for all hosts in start_urls
+                hosts_to_prefetch = {urlparse(u).netloc for u in start_urls}
+                await asyncio.gather(
+                    *(
+                        robots.load(
+                            host,
+                            next(
+                                (
+                                    u
+                                    for u in start_urls
+                                    if urlparse(u).netloc == host
+                                ),
+                                None,
+                            ),
+                        )
+                        for host in hosts_to_prefetch
+                    )
+                )
+                if cfg.sitemaps:
+                    await self._seed_from_sitemaps(
+                        session, robots, start_urls, timeout
+                    )
+
+            try:
+                await asyncio.wait_for(prepare(), timeout=time_left())
+            except asyncio.TimeoutError:
+                self.stop_reason = "time"
+                stop.set()
+
+            host_limiters: dict[str, AsyncLimiter] = defaultdict(
+                lambda: AsyncLimiter(cfg.per_host_qps, 1)
+            )
+            sem = asyncio.Semaphore(cfg.concurrency)
+
+            async def process(item: _Item) -> bool:
+                """Fetch one item; False if it was deferred, not finished."""
+                url, depth, ref, attempt = item
+                if url in visited:
+                    return True
+                if not host_ok(urlparse(url).netloc, cfg.allow_hosts):
+                    return True
+                if dups and dups.is_trap(url):
+                    return True
+                if cfg.respect_robots and not await robots.allowed(url):
+                    return True
+
+                host = urlparse(url).netloc
+                wait = breakers.blocked_for(host)
+                if wait is None:
+                    # Host is dead; drop its URLs.
+                    return True
+                if wait > 0:
+                    retries.schedule(item, wait)
+                    return False
+                if not budget.reserve():
+                    leftover.append(item)
+                    return False
+                limiter = host_limiters[host]
+
+                prev = self.state.get(url)
+                conditional = (
+                    prev.validators() if cfg.recrawl and prev else None
+                )
+
+                async with sem:
+                    async with limiter:
+                        await asyncio.sleep(cfg.delay)
+                        res = await _fetch_html(
+                            session, url, timeout, conditional
+                        )
+
+                if res.error is None:
+                    breakers.record_success(host)
+                elif res.error in policy.retry_on:
+                    breakers.record_failure(host)
+                else:
+                    breakers.record_error(host)
+                if policy.should_retry(res.error, attempt):
+                    budget.release()
+                    retries.schedule(
+                        (url, depth, ref, attempt + 1),
+                        policy.backoff(attempt, res.retry_after),
+                    )
+                    return False
+
+                visited.add(url)
+                page = CrawlPage(
+                    url=url,
+                    depth=depth,
+                    referrer=ref,
+                    status=res.status,
+                    content_type=res.content_type,
+                    text=res.text,
+                    fetched_at=datetime.now(timezone.utc).isoformat(),
+                )
+
+                # Ensure status is not None before numeric comparison to
+                # avoid potential type-checker warnings.
+                digest = None
+                if page.status is not None and page.status < 400 and page.text:
+                    soup = BeautifulSoup(page.text, "html.parser")
+                    visible = soup.get_text(" ")
+                    if cfg.state_path:
+                        digest = content_hash(visible)
+                    if dups:
+                        page.duplicate_of = dups.observe(url, visible)
+                    # A duplicate's links are already (or will be) expanded
+                    # from the original page.
+                    if page.duplicate_of is None:
+                        page.links = await self._enqueue_links(
+                            page, _extract_links(url, soup)
+                        )
+                if cfg.state_path:
+                    self._track(page, prev, res, digest)
+
+                if self.on_page is not None:
+                    res_hook = self.on_page(page)
+                    if inspect.isawaitable(res_hook):
+                        await res_hook
+                await out.put(page)
+                return True
+
+            async def check_idle() -> None:
+                # Idle barrier: nothing queued, waiting, or being fetched
+                # (on any node) means nothing new can ever be discovered.
+                if active or stop.is_set():
+                    return
+                if budget.exhausted:
+                    self.stop_reason = "budget"
+                elif await frontier.pending() == 0:
+                    self.stop_reason = "drained"
+                else:
+                    return
+                stop.set()
+
+            async def next_item() -> _Item:
+                while True:
+                    if ready:
+                        return ready.popleft()
+                    wake.clear()
+                    # With the budget spent nothing more is fetched unless a
+                    # retry hands its slot back, so leave the frontier (and
+                    # its host leases) alone and wait for the idle barrier.
+                    item = None if budget.exhausted else await frontier.pop()
+                    if item is not None:
+                        return (*item, 0)
+                    await check_idle()
+                    try:
+                        await asyncio.wait_for(
+                            wake.wait(), timeout=frontier.poll_interval
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+
+            async def worker() -> None:
+                nonlocal active, failure
+                try:
+                    while not stop.is_set():
+                        item = await next_item()
+                        active += 1
+                        inflight.add(item)
+                        try:
+                            if await process(item):
+                                await frontier.done(item[0])
+                            inflight.discard(item)
+                        finally:
+                            active -= 1
+                        await check_idle()
+                except Exception as exc:
+                    # A hook (or the frontier) failed: stop the crawl, and
+                    # raise the first error once the frontier is saved.
+                    if failure is None:
+                        failure = exc
+                        self.stop_reason = "error"
+                    stop.set()
+
+            def put_ready(item: _Item) -> None:
+                ready.append(item)
+                wake.set()
+
+            async def keepalive(ttl: float) -> None:
+                while True:
+                    await asyncio.sleep(ttl / 3)
+                    await frontier.renew()
+
+            workers = [
+                asyncio.create_task(worker()) for _ in range(cfg.concurrency)
+            ]
+            helpers = [asyncio.create_task(retries.run(put_ready))]
+            if frontier.lease_ttl:
+                helpers.append(
+                    asyncio.create_task(keepalive(frontier.lease_ttl))
+                )
+            try:
+                with (
+                    stop_on_signals(stop)
+                    if cfg.handle_signals
+                    else nullcontext()
+                ):
+                    try:
+                        await asyncio.wait_for(
+                            stop.wait(), timeout=time_left()
+                        )
+                    except asyncio.TimeoutError:
+                        self.stop_reason = self.stop_reason or "time"
+                if self.stop_reason is None:
+                    self.stop_reason = "signal"
+            finally:
+                tasks = (*workers, *helpers)
+                for t in tasks:
+                    t.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        leftover.extend(inflight)
+        leftover.extend(retries.drain())
+        leftover.extend(ready)
+        for u, _, _, _ in leftover:
+            if u in visited:
+                await frontier.done(u)
+        # Unfinished items go back to the frontier (for other nodes, or the
+        # checkpoint below).
+        await frontier.release(
+            [(u, d, r) for u, d, r, _ in leftover if u not in visited]
+        )
+        if cfg.checkpoint_path and not frontier.shared:
+            pending = frontier.drain()
+            if pending:
+                save_checkpoint(
+                    cfg.checkpoint_path,
+                    Checkpoint(visited=visited, frontier=pending),
+                )
+            elif os.path.exists(cfg.checkpoint_path):
+                os.remove(cfg.checkpoint_path)
+        if self._owns_frontier:
+            await frontier.close()
+        if cfg.state_path:
+            save_state(cfg.state_path, self.next_state)
+
+        if failure is not None:
+            raise failure
+        await out.put(None)
+
+    async def _seed_from_sitemaps(
+        self,
+        session: aiohttp.ClientSession,
+        robots: RobotsCache,
+        start_urls: list[str],
+        timeout: ClientTimeout,
+    ) -> None:
+        cfg = self.config
+        todo: list[str] = []
+        for u in start_urls:
+            p = urlparse(u)
+            rs = await robots.load(p.netloc, u)
+            fallback = f"{p.scheme}://{p.netloc}/sitemap.xml"
+            todo.extend(rs.sitemaps or [fallback])
+        seen: set[str] = set()
+        indexes: list[str] = []
+        found: list[FrontierItem] = []
+
+        def on_entry(entry: SitemapEntry) -> None:
+            if entry.is_index:
+                indexes.append(entry.loc)
+            else:
+                item = self._seed_url(entry)
+                if item is not None:
+                    found.append(item)
+
+        while todo and len(seen) < cfg.max_sitemaps:
+            batch = [u for u in dict.fromkeys(todo) if u not in seen]
+            batch = batch[: cfg.max_sitemaps - len(seen)]
+            seen.update(batch)
+            if cfg.respect_robots:
+                batch = [u for u in batch if await robots.allowed(u)]
+            await asyncio.gather(
+                *(_fetch_sitemap(session, u, timeout, on_entry) for u in batch)
+            )
+            await self._offer(found)
+            found = []
+            todo, indexes = indexes, []
+        await self.frontier.mark_seen(self.unchanged)
+
+    def _seed_url(self, entry: SitemapEntry) -> FrontierItem | None:
+        url = norm_url(entry.loc, entry.loc)
+        if not url or not self._wanted(url, 0):
+            return None
+        if entry.lastmod:
+            self.sitemap_lastmod[url] = entry.lastmod
+        prev = self.state.get(url)
+        new_mod = parse_lastmod(entry.lastmod)
+        old_mod = parse_lastmod(prev.lastmod) if prev else None
+        if new_mod and old_mod and new_mod <= old_mod:
+            self.enqueued.add(url)
+            self.unchanged.add(url)
+            return None
+        if entry.priority is not None:
+            self.frontier.hint(url, entry.priority)
+        return (url, 0, None)
+
+    def _track(
+        self,
+        page: CrawlPage,
+        prev: UrlState | None,
+        res: FetchResult,
+        digest: str | None,
+    ) -> None:
+        """Classify the page against the previous run and update state."""
+        url, status = page.url, page.status
+        if status in (404, 410):
+            if prev is not None:
+                page.change = "removed"
+                self.diff.removed.append(url)
+                self.next_state.pop(url, None)
+            return
+        if status is None or status >= 400:
+            return  # transient or unknown: keep what we knew
+        not_modified = status == 304
+        changed = not not_modified and (
+            prev is None or digest != prev.content_hash
+        )
+        if prev is None:
+            page.change = "added"
+            self.diff.added.append(url)
+        elif changed:
+            page.change = "changed"
+            self.diff.changed.append(url)
+        else:
+            page.change = "unchanged"
+        keep = prev if prev is not None else UrlState()
+        self.next_state[url] = UrlState(
+            lastmod=self.sitemap_lastmod.get(url) or keep.lastmod,
+            fetched_at=page.fetched_at,
+            changed_at=page.fetched_at if changed else keep.changed_at,
+            content_hash=keep.content_hash if not_modified else digest,
+            etag=res.etag or (keep.etag if not_modified else None),
+            last_modified=(
+                res.last_modified
+                or (keep.last_modified if not_modified else None)
+            ),
+            depth=(
+                min(page.depth, keep.depth)
+                if keep.depth is not None
+                else page.depth
+            ),
+            revisit=self.config.revisit.next_interval(prev, changed),
+        )
+
+    async def _enqueue_links(
+        self, page: CrawlPage, links: list[str]
+    ) -> list[str]:
+        depth = page.depth + 1
+        # Links to URLs already queued or fetched count as in-links.
+        again = self.enqueued.intersection(links)
+        if again:
+            await self.frontier.link_seen(again)
+        links = self._admit(links, depth)
+        if self.link_scorer is not None:
+            score = self.link_scorer
+            scored = [
+                (sc, u) for u in links if (sc := score(u, page)) is not None
+            ]
+            scored.sort(key=lambda su: su[0], reverse=True)
+            links = [u for _, u in scored]
+        added = await self._offer([(u, depth, page.url) for u in links])
+        return [u for u, _, _ in added]
+
+
+_LINK_ATTRS = {"a": "href", "link": "href", "script": "src", "img": "src"}
+
+
+def _extract_links(base: str, soup: BeautifulSoup) -> list[str]:
+    # One pass over the tree, grouped by tag in _LINK_ATTRS order.
+    hrefs: dict[str, list[str]] = {tag: [] for tag in _LINK_ATTRS}
+    for t in soup.find_all(tuple(_LINK_ATTRS)):
+        href = t.get(_LINK_ATTRS[t.name])
+        # Ensure href is a string or None
+        if isinstance(href, list):
+            href = href[0] if href else None
+        elif not (isinstance(href, str) or href is None):
+            href = str(href)
+        if href:
+            hrefs[t.name].append(href)
+    # Repeated hrefs (nav bars, pagers) are normalized once.
+    unique = dict.fromkeys(h for group in hrefs.values() for h in group)
+    links: list[str] = []
+    for href in unique:
+        u2 = norm_url(base, href)
+        if u2:
+            links.append(u2)
+    return links
+
+
+class _DetailsWriter:
+    """Page hook appending crawl events to a CSV file."""
+
+    def __init__(self, path: str, append: bool):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        append = append and os.path.exists(path)
+        self._f = open(
+            path, "a" if append else "w", encoding="utf-8", newline=""
+        )
+        self._writer = csv.writer(self._f)
+        if not append:
+            self._writer.writerow(
+                [
+                    "url",
+                    "referrer",
+                    "status",
+                    "content_type",
+                    "depth",
+                    "discovered_at",
+                ]
+            )
+
+    def __call__(self, page: CrawlPage) -> None:
+        self._writer.writerow(
+            [
+                page.url,
+                page.referrer or "",
+                page.status if page.status is not None else "",
+                page.content_type or "",
+                page.depth,
+                page.fetched_at,
+            ]
+        )
+
+    def close(self) -> None:
+        """Close the underlying file."""
+        self._f.close()
+
+
+def _cache_html(cache_dir: str, page: CrawlPage) -> None:
+    if page.status is None or page.status >= 400 or not page.text:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    fname = (
+        page.url.replace("https://", "")
+        .replace("http://", "")
+        .replace("/", "__")
+        + ".html"
+    )
+    with open(
+        os.path.join(cache_dir, fname),
+        "w",
+        encoding="utf-8",
+        errors="ignore",
+    ) as hf:
+        hf.write(page.text)
 
 
 async def run_crawl(
@@ -139,182 +1019,84 @@ async def run_crawl(
     sitemap_out: str | None,
     sitemap_max_urls: int,
     sitemap_gzip: bool,
+    near_dup_distance: int | None = 3,
+    max_retries: int = 3,
+    retry_base_delay: float = 1.0,
+    breaker_threshold: int = 5,
+    time_budget: float | None = None,
+    checkpoint_path: str | None = None,
+    sitemaps: bool = False,
+    max_sitemaps: int = 50,
+    state_path: str | None = None,
+    recrawl: bool = False,
+    diff_out: str | None = None,
+    rules: UrlRules | None = None,
+    handle_signals: bool = True,
+    frontier: str | None = None,
+    node_id: str | None = None,
+    lease_ttl: float = DEFAULT_LEASE_TTL,
+    priority: Scorer | None = None,
+    frontier_memory: int = 100_000,
 ) -> list[str]:
     """
-    Concurrent crawl with per-host rate limiting,
-    optional robots, and optional sitemap export.
+    Run a Crawler (see CrawlConfig for the crawl options) and write its
+    results: the sorted URL list, optional CSV details, HTML cache, JSON
+    dump, change diff, and sitemap (with each page's last content change as
+    <lastmod> when crawl state is kept). Stops cleanly on SIGINT/SIGTERM unless
+    ``handle_signals`` is False.
     """
-
-    visited: set[str] = set()
-    enqueued: set[str] = set()
-
-    q: asyncio.Queue[tuple[str, int, str | None]] = asyncio.Queue()
-    for u in start_urls:
-        q.put_nowait((u, 0, None))
-        enqueued.add(u)
-
-    timeout = ClientTimeout(total=request_timeout)
-    connector = aiohttp.TCPConnector(limit=0)
-    headers = {
-        "User-Agent": user_agent,
-        "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.1",
-    }
-
-    async with aiohttp.ClientSession(
-        timeout=timeout, connector=connector, headers=headers
-    ) as session:
-        robots = RobotsCache(session, user_agent)
-
-        # Prefetch robots.txt for all hosts in start_urls
-        hosts_to_prefetch = {urlparse(u).netloc for u in start_urls}
-        await asyncio.gather(
-            *(
-                robots.load(
-                    host,
-                    next(
-                        (u for u in start_urls if urlparse(u).netloc == host),
-                        None,
-                    ),
-                )
-                for host in hosts_to_prefetch
-            )
-        )
-
-        # CSV details
-        detf = None
-        writer = None
-        if details_path:
-            os.makedirs(os.path.dirname(details_path), exist_ok=True)
-            detf = open(details_path, "w", encoding="utf-8", newline="")
-            writer = csv.writer(detf)
-            writer.writerow(
-                [
-                    "url",
-                    "referrer",
-                    "status",
-                    "content_type",
-                    "depth",
-                    "discovered_at",
-                ]
-            )
-
-        host_limiters: dict[str, AsyncLimiter] = defaultdict(
-            lambda: AsyncLimiter(per_host_qps, 1)
+    config = CrawlConfig(
+        start_urls=list(start_urls),
+        allow_hosts=allow_hosts,
+        rules=rules,
+        max_pages=max_pages,
+        max_depth=max_depth,
+        concurrency=concurrency,
+        per_host_qps=per_host_qps,
+        delay=delay,
+        user_agent=user_agent,
+        request_timeout=request_timeout,
+        respect_robots=respect_robots,
+        include_assets=include_assets,
+        near_dup_distance=near_dup_distance,
+        max_retries=max_retries,
+        retry_base_delay=retry_base_delay,
+        breaker_threshold=breaker_threshold,
+        time_budget=time_budget,
+        checkpoint_path=checkpoint_path,
+        sitemaps=sitemaps,
+        max_sitemaps=max_sitemaps,
+        state_path=state_path,
+        recrawl=recrawl,
+        handle_signals=handle_signals,
+        frontier=frontier,
+        node_id=node_id,
+        lease_ttl=lease_ttl,
+        priority=priority,
+        frontier_memory=frontier_memory,
+    )
+    details = (
+        _DetailsWriter(
+            details_path,
+            append=bool(checkpoint_path and os.path.exists(checkpoint_path)),
         )
-        sem = asyncio.Semaphore(concurrency)
+        if details_path
+        else None
+    )
 
-        async def worker() -> None:
-            while len(visited) < max_pages:
-                try:
-                    url, depth, ref = await asyncio.wait_for(
-                        q.get(), timeout=1.0
-                    )
-                except asyncio.TimeoutError:
-                    if q.empty():
-                        break
-                    continue
+    def store(page: CrawlPage) -> None:
+        if details:
+            details(page)
+        if cache_html_dir:
+            _cache_html(cache_html_dir, page)
 
-                if url in visited:
-                    q.task_done()
-                    continue
-                if not host_ok(urlparse(url).netloc, allow_hosts):
-                    q.task_done()
-                    continue
-                if respect_robots and not await robots.allowed(url):
-                    q.task_done()
-                    continue
-
-                host = urlparse(url).netloc
-                limiter = host_limiters[host]
-
-                async with sem:
-                    async with limiter:
-                        await asyncio.sleep(delay)
-                        # Ensure variables are always bound so downstream use
-                        # (e.g. writer.writerow) cannot see them as possibly
-                        # unbound.
-                        status: int | None = None
-                        ct: str | None = None
-                        text: str = ""
-                        status, ct, text = await _fetch_html(
-                            session, url, timeout
-                        )
-
-                visited.add(url)
-                if writer:
-                    writer.writerow(
-                        [
-                            url,
-                            ref or "",
-                            status if status is not None else "",
-                            ct or "",
-                            depth,
-                            datetime.now(timezone.utc).isoformat(),
-                        ]
-                    )
+    crawler = Crawler(config, on_page=store)
+    try:
+        unique_sorted = await crawler.run()
+    finally:
+        if details:
+            details.close()
 
-                # Ensure status is not None before numeric comparison to avoid
-                # potential "possibly unbound" / type-checker warnings.
-                if status is not None and status < 400 and text:
-                    if cache_html_dir:
-                        os.makedirs(cache_html_dir, exist_ok=True)
-                        fname = (
-                            url.replace("https://", "")
-                            .replace("http://", "")
-                            .replace("/", "__")
-                            + ".html"
-                        )
-                        with open(
-                            os.path.join(cache_html_dir, fname),
-                            "w",
-                            encoding="utf-8",
-                            errors="ignore",
-                        ) as hf:
-                            hf.write(text)
-
-                    soup = BeautifulSoup(text, "html.parser")
-                    links: list[str] = []
-                    for tag, attr in (
-                        ("a", "href"),
-                        ("link", "href"),
-                        ("script", "src"),
-                        ("img", "src"),
-                    ):
-                        for t in soup.find_all(tag):
-                            href = t.get(attr)
-                            # Ensure href is a string or None
-                            if isinstance(href, list):
-                                href = href[0] if href else None
-                            elif not (isinstance(href, str) or href is None):
-                                href = str(href)
-                            u2 = norm_url(url, href)
-                            if u2:
-                                links.append(u2)
-
-                    if not include_assets:
-                        links = [u for u in links if is_probably_html(u)]
-
-                    for u2 in links:
-                        if (
-                            u2 not in enqueued
-                            and host_ok(urlparse(u2).netloc, allow_hosts)
-                            and (
-                                (max_depth is None) or (depth + 1 <= max_depth)
-                            )
-                        ):
-                            enqueued.add(u2)
-                            q.put_nowait((u2, depth + 1, url))
-
-                q.task_done()
-
-        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
-        await q.join()
-        for w in workers:
-            w.cancel()
-        if detf:
-            detf.close()
-
-    unique_sorted = sorted(visited)
     os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
     with open(out_path, "w", encoding="utf-8") as outf:
         outf.write("\n".join(unique_sorted))
@@ -327,12 +1109,21 @@ async def run_crawl(
                 {"urls": unique_sorted}, jf, ensure_ascii=False, indent=2
             )
 
+    if diff_out:
+        crawler.diff.save(diff_out)
+
     if sitemap_out:
+        lastmod = {
+            u: st.changed_at[:10]
+            for u, st in crawler.next_state.items()
+            if st.changed_at
+        }
         write_sitemap_auto(
             unique_sorted,
             sitemap_out,
             max_urls=sitemap_max_urls,
             gzip_output=sitemap_gzip,
+            lastmod=lastmod,
         )
 
     return unique_sorted
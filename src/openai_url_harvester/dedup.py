@@ -0,0 +1,172 @@
+"""
+Near-duplicate content detection for the crawler.
+Provides SimHash fingerprints, a block-indexed lookup table, and a tracker
+that flags URL patterns which keep producing duplicate pages (traps).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from urllib.parse import parse_qsl, urlparse
+
+FINGERPRINT_BITS = 64
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_DIGITS_RE = re.compile(r"\d+")
+_ID_RE = re.compile(r"^(?=.*\d)[0-9a-f-]{16,}$", re.IGNORECASE)
+
+
+def _hash64(token: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+def simhash(text: str, shingle: int = 3) -> int:
+    """Return a 64-bit SimHash of the word shingles in text."""
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return 0
+    if len(words) < shingle:
+        features = [" ".join(words)]
+    else:
+        features = [
+            " ".join(words[i : i + shingle])
+            for i in range(len(words) - shingle + 1)
+        ]
+    # Count set bits per position column-wise over fixed-width bit strings;
+    # this keeps the inner loop in C instead of 64 Python ops per feature.
+    bits = [format(_hash64(f), "064b") for f in features]
+    half = len(bits) / 2
+    fp = 0
+    for col in zip(*bits):
+        fp = (fp << 1) | (col.count("1") > half)
+    return fp
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints."""
+    return (a ^ b).bit_count()
+
+
+class SimHashIndex:
+    """
+    Index of fingerprints for fast near-duplicate lookup.
+
+    Splits each fingerprint into ``max_distance + 1`` blocks; by the
+    pigeonhole principle any fingerprint within ``max_distance`` bits shares
+    at least one block exactly, so only bucket-mates need a full comparison.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        if not 0 <= max_distance < FINGERPRINT_BITS:
+            raise ValueError("max_distance must be in [0, 63]")
+        self.max_distance = max_distance
+        nblocks = max_distance + 1
+        width, extra = divmod(FINGERPRINT_BITS, nblocks)
+        self._blocks: list[tuple[int, int]] = []  # (shift, mask)
+        shift = FINGERPRINT_BITS
+        for i in range(nblocks):
+            w = width + (1 if i < extra else 0)
+            shift -= w
+            self._blocks.append((shift, (1 << w) - 1))
+        self._tables: list[dict[int, list[tuple[int, str]]]] = [
+            defaultdict(list) for _ in range(nblocks)
+        ]
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, fp: int, key: str) -> None:
+        """Insert fingerprint fp under key."""
+        for table, (shift, mask) in zip(self._tables, self._blocks):
+            table[(fp >> shift) & mask].append((fp, key))
+        self._size += 1
+
+    def find(self, fp: int) -> str | None:
+        """Return the key of a stored near-duplicate of fp, or None."""
+        for table, (shift, mask) in zip(self._tables, self._blocks):
+            for other, key in table.get((fp >> shift) & mask, ()):
+                if hamming(fp, other) <= self.max_distance:
+                    return key
+        return None
+
+
+def url_pattern(url: str) -> str:
+    """
+    Collapse a URL into a trap-detection pattern: numbers and id-like path
+    segments are wildcarded and only the sorted query keys are kept.
+    """
+    p = urlparse(url)
+    segs = []
+    for seg in p.path.split("/"):
+        if _ID_RE.match(seg):
+            segs.append("{id}")
+        else:
+            segs.append(_DIGITS_RE.sub("{n}", seg))
+    keys = sorted({k for k, _ in parse_qsl(p.query, keep_blank_values=True)})
+    pattern = p.netloc.lower() + "/".join(segs)
+    if keys:
+        pattern += "?" + "&".join(keys)
+    return pattern
+
+
+@dataclass
+class _PatternStats:
+    pages: int = 0
+    duplicates: int = 0
+
+
+@dataclass
+class DuplicateTracker:
+    """
+    Record page fingerprints and flag URL patterns that repeatedly yield
+    near-duplicate content.
+
+    A pattern is flagged once it has produced at least ``min_duplicates``
+    duplicates and duplicates make up at least ``trap_ratio`` of its pages.
+    """
+
+    max_distance: int = 3
+    min_duplicates: int = 5
+    trap_ratio: float = 0.5
+    index: SimHashIndex = field(init=False)
+    flagged: set[str] = field(default_factory=set)
+    _stats: dict[str, _PatternStats] = field(
+        default_factory=lambda: defaultdict(_PatternStats)
+    )
+
+    def __post_init__(self) -> None:
+        self.index = SimHashIndex(self.max_distance)
+
+    def observe(self, url: str, text: str) -> str | None:
+        """
+        Fingerprint a fetched page. Returns the URL of an earlier
+        near-duplicate, or None if the content is new (and now indexed).
+        """
+        if not _WORD_RE.search(text):
+            # Text-less pages (script shells, framesets) all hash alike.
+            return None
+        fp = simhash(text)
+        pattern = url_pattern(url)
+        stats = self._stats[pattern]
+        stats.pages += 1
+        dup = self.index.find(fp)
+        if dup is None:
+            self.index.add(fp, url)
+            return None
+        stats.duplicates += 1
+        if (
+            stats.duplicates >= self.min_duplicates
+            and stats.duplicates >= self.trap_ratio * stats.pages
+        ):
+            self.flagged.add(pattern)
+        return dup
+
+    def is_trap(self, url: str) -> bool:
+        """True if url matches a pattern flagged as a duplicate trap."""
+        return bool(self.flagged) and url_pattern(url) in self.flagged
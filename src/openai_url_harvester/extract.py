@@ -1,6 +1,9 @@
 """extract.py: Utilities for extracting URLs from files and
 directories. Supports text, HTML, and PDF files. Provides
 functions to extract URLs and save them in list or JSON format.
+
+The parsers (chardet, BeautifulSoup, pdfminer) are imported on first use
+so runs over plain-text files never pay for them.
 """
 
 from __future__ import annotations
@@ -10,15 +13,13 @@ import pathlib
 import re
 from typing import Iterable
 
-from bs4 import BeautifulSoup
-from chardet import detect
-from pdfminer.high_level import extract_text as pdf_extract_text
-
 URL_RE = re.compile(r"(https?://[^\s<>'\"\\)\\]]+)", re.IGNORECASE)
 
 
 def _read_text_guess(path: pathlib.Path) -> str:
     """Read file as text using chardet to guess encoding."""
+    from chardet import detect
+
     b = path.read_bytes()
     enc = "utf-8"
     try:
@@ -47,6 +48,8 @@ def extract_from_files(paths: Iterable[str]) -> list[str]:
                     txt = _read_text_guess(pth)
                     urls.update(URL_RE.findall(txt))
                     if lower in {".html", ".htm"}:
+                        from bs4 import BeautifulSoup
+
                         soup = BeautifulSoup(txt, "html.parser")
                         for tag, attr in (("a", "href"), ("link", "href")):
                             for t in soup.find_all(tag):
@@ -62,6 +65,10 @@ def extract_from_files(paths: Iterable[str]) -> list[str]:
                                     ):
                                         urls.add(href_str)
                 elif lower == ".pdf":
+                    from pdfminer.high_level import (
+                        extract_text as pdf_extract_text,
+                    )
+
                     txt = pdf_extract_text(str(pth)) or ""
                     urls.update(URL_RE.findall(txt))
             except (OSError, UnicodeDecodeError, ValueError):
@@ -70,6 +77,13 @@ def extract_from_files(paths: Iterable[str]) -> list[str]:
     return sorted(urls)
 
 
+def preload() -> None:
+    """Import the lazily loaded parsers now (for long-running processes)."""
+    import bs4  # noqa: F401
+    import chardet  # noqa: F401
+    import pdfminer.high_level  # noqa: F401
+
+
 def save_list(urls: list[str], out_path: str) -> None:
     """Save a list of URLs to a text file, one URL per line."""
     with open(out_path, "w", encoding="utf-8") as f:
@@ -0,0 +1,584 @@
+"""
+Frontier backends: the seen-set and the queue of URLs still to fetch.
+
+The default ``MemoryFrontier`` is process-local. ``SqliteFrontier`` (one
+file, several processes on one machine) and ``RedisFrontier`` (any number
+of machines) let several crawler nodes share one frontier. Shared backends
+hand out URLs per host under a lease: a node only fetches a host while it
+holds that host's lease, so per-host rate limits still hold across nodes.
+A lease is renewed while its node is alive; once it expires another node
+takes the host over and requeues whatever the old owner had in flight.
+
+``open_frontier`` builds a backend from a URL::
+
+    None / "memory:"           in-process (default)
+    sqlite:///frontier.db      shared through a SQLite file (4 slashes
+                               for an absolute path)
+    redis://host:6379/0        shared through a Redis-protocol server
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Sequence
+from urllib.parse import unquote, urlparse
+
+from .lifecycle import FrontierItem
+
+DEFAULT_LEASE_TTL = 30.0
+POLL_INTERVAL = 0.25  # seconds between pops when a shared frontier is idle
+
+
+def default_node_id() -> str:
+    """A node id unique to this process: ``hostname-pid``."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _host(url: str) -> str:
+    return urlparse(url).netloc
+
+
+class FrontierBackend:
+    """
+    Interface shared by all frontier backends.
+
+    Every item handed out by ``pop`` stays pending until ``done`` is called
+    for its URL or it is given back with ``release``; ``pending`` counts
+    queued plus handed-out items across all nodes, so it is 0 only when the
+    whole crawl has drained.
+    """
+
+    shared = False  # True if several nodes can use the frontier at once
+    poll_interval: float | None = None  # None: pops only change on add()
+    lease_ttl: float | None = None  # seconds; None if there are no leases
+
+    async def add(self, items: Sequence[FrontierItem]) -> list[FrontierItem]:
+        """Queue the items whose URL was never seen; return those queued."""
+        raise NotImplementedError
+
+    async def mark_seen(self, urls: Iterable[str]) -> None:
+        """Record URLs as seen without queueing them."""
+        raise NotImplementedError
+
+    async def pop(self) -> FrontierItem | None:
+        """Next item this node may fetch, or None if there is none now."""
+        raise NotImplementedError
+
+    async def done(self, url: str) -> None:
+        """Mark a popped URL as finished (fetched or dropped)."""
+        raise NotImplementedError
+
+    async def pending(self) -> int:
+        """Queued plus popped-but-unfinished items, across all nodes."""
+        raise NotImplementedError
+
+    async def release(self, items: Sequence[FrontierItem]) -> None:
+        """Requeue unfinished popped items and give up this node's leases."""
+        raise NotImplementedError
+
+    async def renew(self) -> None:
+        """Extend this node's host leases."""
+
+    async def link_seen(self, urls: Iterable[str]) -> None:
+        """Count another in-link to already seen URLs (for prioritizing)."""
+
+    def hint(self, url: str, sitemap_priority: float) -> None:
+        """Pass a sitemap <priority> for a URL about to be added."""
+
+    def drain(self) -> list[FrontierItem]:
+        """
+        Remove and return every queued item, for a checkpoint. Only
+        process-local backends implement it; shared ones persist themselves.
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release connections and files."""
+
+
+class MemoryFrontier(FrontierBackend):
+    """In-process FIFO frontier; the default for single-node crawls."""
+
+    def __init__(self) -> None:
+        self._seen: set[str] = set()
+        self._queue: deque[FrontierItem] = deque()
+        self._popped = 0
+
+    async def add(self, items: Sequence[FrontierItem]) -> list[FrontierItem]:
+        seen = self._seen
+        added = []
+        for item in items:
+            if item[0] not in seen:
+                seen.add(item[0])
+                added.append(item)
+        self._queue.extend(added)
+        return added
+
+    async def mark_seen(self, urls: Iterable[str]) -> None:
+        self._seen.update(urls)
+
+    async def pop(self) -> FrontierItem | None:
+        if not self._queue:
+            return None
+        self._popped += 1
+        return self._queue.popleft()
+
+    async def done(self, url: str) -> None:
+        self._popped -= 1
+
+    async def pending(self) -> int:
+        return len(self._queue) + self._popped
+
+    async def release(self, items: Sequence[FrontierItem]) -> None:
+        self._queue.extendleft(reversed(items))
+        self._popped -= len(items)
+
+    def drain(self) -> list[FrontierItem]:
+        items = list(self._queue)
+        self._queue.clear()
+        return items
+
+
+_QUEUED, _POPPED, _DONE = 0, 1, 2
+_SQL_CHUNK = 500  # bound parameters per IN (...) lookup
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    url TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    referrer TEXT,
+    state INTEGER NOT NULL,
+    node TEXT
+);
+CREATE INDEX IF NOT EXISTS frontier_queue ON frontier (state, host);
+CREATE TABLE IF NOT EXISTS leases (
+    host TEXT PRIMARY KEY,
+    node TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+
+class SqliteFrontier(FrontierBackend):
+    """
+    Frontier in a SQLite file, shared by crawler processes on one machine.
+
+    Queue order is insertion order (rowid). Calls run on the event loop;
+    they are short local transactions.
+    """
+
+    shared = True
+    poll_interval = POLL_INTERVAL
+    lease_ttl: float
+
+    def __init__(
+        self,
+        path: str,
+        node_id: str | None = None,
+        lease_ttl: float = DEFAULT_LEASE_TTL,
+        clock: Callable[[], float] = time.time,
+    ):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.node_id = node_id or default_node_id()
+        self.lease_ttl = lease_ttl
+        self._clock = clock
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SQLITE_SCHEMA)
+        with self._tx():
+            # Items a previous process with this node id left in flight.
+            self._db.execute(
+                "UPDATE frontier SET state=?, node=NULL "
+                "WHERE state=? AND node=?",
+                (_QUEUED, _POPPED, self.node_id),
+            )
+
+    @contextmanager
+    def _tx(self) -> Iterator[None]:
+        # IMMEDIATE takes the write lock up front, so two nodes can never
+        # both see a host as unleased.
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    async def add(self, items: Sequence[FrontierItem]) -> list[FrontierItem]:
+        if not items:
+            return []
+        urls = [u for u, _, _ in items]
+        with self._tx():
+            # One lookup per chunk, then one bulk insert of the new URLs.
+            known: set[str] = set()
+            for i in range(0, len(urls), _SQL_CHUNK):
+                chunk = urls[i : i + _SQL_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                known.update(
+                    r[0]
+                    for r in self._db.execute(
+                        f"SELECT url FROM frontier WHERE url IN ({marks})",
+                        chunk,
+                    )
+                )
+            added = []
+            for item in items:
+                if item[0] not in known:
+                    known.add(item[0])
+                    added.append(item)
+            self._db.executemany(
+                "INSERT INTO frontier (url, host, depth, referrer, state) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(u, _host(u), d, r, _QUEUED) for u, d, r in added],
+            )
+        return added
+
+    async def mark_seen(self, urls: Iterable[str]) -> None:
+        with self._tx():
+            self._db.executemany(
+                "INSERT OR IGNORE INTO frontier "
+                "(url, host, depth, referrer, state) "
+                "VALUES (?, ?, 0, NULL, ?)",
+                [(u, _host(u), _DONE) for u in urls],
+            )
+
+    async def pop(self) -> FrontierItem | None:
+        now = self._clock()
+        with self._tx():
+            # Expired leases of other nodes: requeue what they had in flight.
+            stale = self._db.execute(
+                "SELECT host FROM leases WHERE node!=? AND expires<=?",
+                (self.node_id, now),
+            ).fetchall()
+            if stale:
+                self._db.executemany(
+                    "UPDATE frontier SET state=?, node=NULL "
+                    "WHERE host=? AND state=?",
+                    [(_QUEUED, h, _POPPED) for (h,) in stale],
+                )
+                self._db.executemany(
+                    "DELETE FROM leases WHERE host=?", stale
+                )
+            row = self._db.execute(
+                "SELECT url, host, depth, referrer FROM frontier "
+                "WHERE state=? AND host NOT IN "
+                "(SELECT host FROM leases WHERE node!=? AND expires>?) "
+                "ORDER BY rowid LIMIT 1",
+                (_QUEUED, self.node_id, now),
+            ).fetchone()
+            if row is None:
+                return None
+            url, host, depth, ref = row
+            self._db.execute(
+                "INSERT OR REPLACE INTO leases (host, node, expires) "
+                "VALUES (?, ?, ?)",
+                (host, self.node_id, now + self.lease_ttl),
+            )
+            self._db.execute(
+                "UPDATE frontier SET state=?, node=? WHERE url=?",
+                (_POPPED, self.node_id, url),
+            )
+        return url, depth, ref
+
+    async def done(self, url: str) -> None:
+        with self._tx():
+            self._db.execute(
+                "UPDATE frontier SET state=?, node=NULL WHERE url=?",
+                (_DONE, url),
+            )
+
+    async def pending(self) -> int:
+        (n,) = self._db.execute(
+            "SELECT COUNT(*) FROM frontier WHERE state!=?", (_DONE,)
+        ).fetchone()
+        return n
+
+    async def release(self, items: Sequence[FrontierItem]) -> None:
+        with self._tx():
+            self._db.executemany(
+                "UPDATE frontier SET state=?, node=NULL "
+                "WHERE url=? AND state=?",
+                [(_QUEUED, u, _POPPED) for u, _, _ in items],
+            )
+            self._db.execute(
+                "DELETE FROM leases WHERE node=?", (self.node_id,)
+            )
+
+    async def renew(self) -> None:
+        with self._tx():
+            self._db.execute(
+                "UPDATE leases SET expires=? WHERE node=?",
+                (self._clock() + self.lease_ttl, self.node_id),
+            )
+
+    async def close(self) -> None:
+        self._db.close()
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+
+class RespClient:
+    """
+    Minimal asyncio client for the Redis serialization protocol (RESP2).
+
+    Commands are pipelined: ``execute`` writes every command before reading
+    the replies. A lock keeps concurrent callers' replies apart.
+    """
+
+    def __init__(self, host: str, port: int, db: int = 0):
+        self.host, self.port, self.db = host, port, db
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host, self.port
+        )
+        if self.db:
+            self._writer.write(_encode(("SELECT", self.db)))
+            await _read_reply(self._reader)
+
+    async def execute(self, *commands: Sequence[Any]) -> list[Any]:
+        """Send commands in one round trip; return their replies."""
+        async with self._lock:
+            if self._writer is None:
+                await self._connect()
+            assert self._reader is not None and self._writer is not None
+            self._writer.write(b"".join(_encode(c) for c in commands))
+            await self._writer.drain()
+            replies = [await _read_reply(self._reader) for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    async def call(self, *args: Any) -> Any:
+        """Send one command and return its reply."""
+        return (await self.execute(args))[0]
+
+    async def close(self) -> None:
+        """Close the connection."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def _encode(args: Sequence[Any]) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for a in args:
+        b = a if isinstance(a, bytes) else str(a).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(b), b))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("connection closed by server")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode("utf-8")
+    if kind == b"-":
+        return RespError(body.decode("utf-8"))
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        n = int(body)
+        if n < 0:
+            return None
+        data = await reader.readexactly(n + 2)
+        return data[:-2].decode("utf-8")
+    if kind == b"*":
+        n = int(body)
+        if n < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(n)]
+    raise RespError(f"bad reply {line!r}")
+
+
+class RedisFrontier(FrontierBackend):
+    """
+    Frontier in a Redis-protocol server, shared by nodes on any machine.
+
+    Keys (under ``prefix``): ``seen`` (set), ``hosts`` (set of hosts that
+    ever had URLs), ``q:<host>`` (list of queued items), ``inflight:<host>``
+    (hash of popped items), ``lease:<host>`` (owning node id, with a TTL)
+    and ``pending`` (counter). Only plain commands are used, so any server
+    speaking the protocol works.
+    """
+
+    shared = True
+    poll_interval = POLL_INTERVAL
+    lease_ttl: float
+
+    def __init__(
+        self,
+        client: RespClient,
+        node_id: str | None = None,
+        lease_ttl: float = DEFAULT_LEASE_TTL,
+        prefix: str = "frontier",
+    ):
+        self.client = client
+        self.node_id = node_id or default_node_id()
+        self.lease_ttl = lease_ttl
+        self.prefix = prefix
+        self._owned: list[str] = []  # hosts leased by this node, round-robin
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix, *parts))
+
+    async def add(self, items: Sequence[FrontierItem]) -> list[FrontierItem]:
+        if not items:
+            return []
+        fresh = await self.client.execute(
+            *(("SADD", self._key("seen"), u) for u, _, _ in items)
+        )
+        added = [item for item, new in zip(items, fresh) if new]
+        if not added:
+            return []
+        cmds: list[tuple[Any, ...]] = [
+            ("INCRBY", self._key("pending"), len(added))
+        ]
+        for url, depth, ref in added:
+            host = _host(url)
+            cmds.append(
+                ("RPUSH", self._key("q", host), json.dumps([url, depth, ref]))
+            )
+            cmds.append(("SADD", self._key("hosts"), host))
+        await self.client.execute(*cmds)
+        return added
+
+    async def mark_seen(self, urls: Iterable[str]) -> None:
+        urls = list(urls)
+        if urls:
+            await self.client.call("SADD", self._key("seen"), *urls)
+
+    async def pop(self) -> FrontierItem | None:
+        owned = self._owned
+        for _ in range(len(owned)):
+            host = owned[0]
+            owned.append(owned.pop(0))
+            item = await self._pop_host(host)
+            if item is not None:
+                return item
+        hosts = [
+            h
+            for h in await self.client.call("SMEMBERS", self._key("hosts"))
+            if h not in owned
+        ]
+        if not hosts:
+            return None
+        leases = await self.client.call(
+            "MGET", *(self._key("lease", h) for h in hosts)
+        )
+        ms = int(self.lease_ttl * 1000)
+        for host, owner in zip(hosts, leases):
+            if owner is not None:
+                continue
+            if not await self.client.call(
+                "SET", self._key("lease", host), self.node_id, "NX", "PX", ms
+            ):
+                continue  # another node was faster
+            owned.append(host)
+            await self._recover(host)
+            item = await self._pop_host(host)
+            if item is not None:
+                return item
+        return None
+
+    async def _pop_host(self, host: str) -> FrontierItem | None:
+        raw = await self.client.call("LPOP", self._key("q", host))
+        if raw is None:
+            return None
+        url, depth, ref = json.loads(raw)
+        await self.client.call("HSET", self._key("inflight", host), url, raw)
+        return url, int(depth), ref
+
+    async def _recover(self, host: str) -> None:
+        # A fresh lease means nobody owns the host, so anything still in
+        # flight for it was abandoned by a node that died.
+        flat = await self.client.call("HGETALL", self._key("inflight", host))
+        if flat:
+            await self.client.execute(
+                ("LPUSH", self._key("q", host), *flat[1::2]),
+                ("DEL", self._key("inflight", host)),
+            )
+
+    async def done(self, url: str) -> None:
+        await self.client.execute(
+            ("HDEL", self._key("inflight", _host(url)), url),
+            ("DECR", self._key("pending")),
+        )
+
+    async def pending(self) -> int:
+        return int(await self.client.call("GET", self._key("pending")) or 0)
+
+    async def release(self, items: Sequence[FrontierItem]) -> None:
+        cmds: list[tuple[Any, ...]] = []
+        for url, depth, ref in items:
+            host = _host(url)
+            cmds.append(("HDEL", self._key("inflight", host), url))
+            cmds.append(
+                ("LPUSH", self._key("q", host), json.dumps([url, depth, ref]))
+            )
+        cmds.extend(("DEL", self._key("lease", h)) for h in self._owned)
+        if cmds:
+            await self.client.execute(*cmds)
+        self._owned.clear()
+
+    async def renew(self) -> None:
+        if not self._owned:
+            return
+        owners = await self.client.call(
+            "MGET", *(self._key("lease", h) for h in self._owned)
+        )
+        # A lease that expired may have been taken over; let it go.
+        self._owned = [
+            h for h, o in zip(self._owned, owners) if o == self.node_id
+        ]
+        ms = int(self.lease_ttl * 1000)
+        if self._owned:
+            await self.client.execute(
+                *(("PEXPIRE", self._key("lease", h), ms) for h in self._owned)
+            )
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def open_frontier(
+    url: str | None,
+    node_id: str | None = None,
+    lease_ttl: float = DEFAULT_LEASE_TTL,
+) -> FrontierBackend:
+    """Build a frontier backend from a URL (see module docstring)."""
+    if not url or url in ("memory", "memory:"):
+        return MemoryFrontier()
+    p = urlparse(url)
+    if p.scheme == "sqlite":
+        # sqlite:///rel.db and sqlite:////abs/path.db, as in SQLAlchemy.
+        path = unquote(url.split("://", 1)[1])
+        path = path[1:] if path.startswith("/") else path
+        return SqliteFrontier(path, node_id=node_id, lease_ttl=lease_ttl)
+    if p.scheme == "redis":
+        db = int(p.path.strip("/") or 0)
+        prefix = p.fragment or "frontier"
+        return RedisFrontier(
+            RespClient(p.hostname or "127.0.0.1", p.port or 6379, db),
+            node_id=node_id,
+            lease_ttl=lease_ttl,
+            prefix=prefix,
+        )
+    raise ValueError(f"unsupported frontier URL {url!r}")
@@ -0,0 +1,113 @@
+"""
+Crawl lifecycle helpers: an exact page budget, stop-signal handling, and
+frontier checkpoints so an interrupted crawl can resume where it stopped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import signal
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+# (url, depth, referrer)
+FrontierItem = tuple[str, int, str | None]
+
+
+class CrawlBudget:
+    """
+    Page budget reserved when a URL is dequeued for fetching.
+
+    Reservation is synchronous, so concurrent workers can never overshoot
+    ``limit``; a fetch that ends up being retried later releases its slot.
+    """
+
+    def __init__(self, limit: int, used: int = 0):
+        self.limit = limit
+        self.used = used
+
+    @property
+    def exhausted(self) -> bool:
+        """True once every page of the budget has been reserved."""
+        return self.used >= self.limit
+
+    def reserve(self) -> bool:
+        """Take one page from the budget; False if none are left."""
+        if self.used >= self.limit:
+            return False
+        self.used += 1
+        return True
+
+    def release(self) -> None:
+        """Return a reserved page to the budget."""
+        self.used -= 1
+
+
+@contextmanager
+def stop_on_signals(stop: asyncio.Event) -> Iterator[None]:
+    """Set ``stop`` on SIGINT/SIGTERM for the duration of the block."""
+    loop = asyncio.get_running_loop()
+    sigs = [signal.SIGINT, getattr(signal, "SIGTERM", signal.SIGINT)]
+    installed: list[signal.Signals] = []
+    previous: dict[signal.Signals, Any] = {}
+    for sig in dict.fromkeys(sigs):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+            installed.append(sig)
+        except (NotImplementedError, RuntimeError, ValueError):
+            # Windows event loops lack add_signal_handler; fall back to
+            # signal.signal, which only works from the main thread.
+            try:
+                previous[sig] = signal.signal(
+                    sig, lambda *_: loop.call_soon_threadsafe(stop.set)
+                )
+            except ValueError:
+                pass
+    try:
+        yield
+    finally:
+        for sig in installed:
+            loop.remove_signal_handler(sig)
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+
+
+@dataclass
+class Checkpoint:
+    """Visited URLs and the unfinished frontier of an interrupted crawl."""
+
+    visited: set[str] = field(default_factory=set)
+    frontier: list[FrontierItem] = field(default_factory=list)
+
+
+def load_checkpoint(path: str | None) -> Checkpoint | None:
+    """Load a checkpoint written by save_checkpoint, if it exists."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return Checkpoint(
+        visited=set(data.get("visited", [])),
+        frontier=[
+            (u, int(d), r or None) for u, d, r in data.get("frontier", [])
+        ],
+    )
+
+
+def save_checkpoint(path: str, cp: Checkpoint) -> None:
+    """Atomically write a checkpoint as JSON."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "visited": sorted(cp.visited),
+                "frontier": [[u, d, r or ""] for u, d, r in cp.frontier],
+            },
+            f,
+            ensure_ascii=False,
+        )
+    os.replace(tmp, path)
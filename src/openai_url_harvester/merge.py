@@ -0,0 +1,92 @@
+"""
+Merge the outputs of several crawler nodes that shared one frontier.
+
+Each node writes its own URL list, details CSV and JSON export; merging
+unions the URL lists (text or JSON exports), concatenates the details in
+discovery order, and writes the combined URL list, JSON and sitemap.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+from typing import Iterable
+
+from .sitemap import write_sitemap_auto
+
+
+def _read_urls(path: str) -> list[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return list(json.load(f).get("urls", []))
+        return [line.strip() for line in f if line.strip()]
+
+
+def _merge_details(paths: Iterable[str], out_path: str) -> None:
+    header: list[str] | None = None
+    rows: list[list[str]] = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            head = next(reader, None)
+            if head is None:
+                continue
+            if header is None:
+                header = head
+            elif head != header:
+                raise ValueError(f"{path}: details columns differ")
+            rows.extend(reader)
+    if header is None:
+        return
+    # Columns are url, ..., discovered_at (ISO 8601, so it sorts as text).
+    rows.sort(key=lambda r: r[-1])
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def merge_outputs(
+    inputs: Iterable[str],
+    out_path: str,
+    details: Iterable[str] = (),
+    details_out: str | None = None,
+    export_json_path: str | None = None,
+    sitemap_out: str | None = None,
+    sitemap_max_urls: int = 50_000,
+    sitemap_gzip: bool = False,
+) -> list[str]:
+    """
+    Union the nodes' URL lists into out_path (plus optional merged details
+    CSV, JSON export and sitemap); returns the sorted URLs.
+    """
+    urls: set[str] = set()
+    for path in inputs:
+        urls.update(_read_urls(path))
+    unique_sorted = sorted(urls)
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(unique_sorted))
+
+    if details_out:
+        _merge_details(details, details_out)
+
+    if export_json_path:
+        os.makedirs(os.path.dirname(export_json_path) or ".", exist_ok=True)
+        with open(export_json_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"urls": unique_sorted}, f, ensure_ascii=False, indent=2
+            )
+
+    if sitemap_out:
+        write_sitemap_auto(
+            unique_sorted,
+            sitemap_out,
+            max_urls=sitemap_max_urls,
+            gzip_output=sitemap_gzip,
+        )
+
+    return unique_sorted
@@ -0,0 +1,395 @@
+"""
+Best-first crawl frontier.
+
+``PriorityFrontier`` hands out the queued URL with the highest score
+instead of the oldest one, so a page budget is spent on the most valuable
+pages first. Scores come from pluggable scorers, combined as a weighted
+sum (see ``build_scorer``)::
+
+    depth     -depth: shallow pages first
+    inlinks   log(1 + links to the URL seen so far in this crawl)
+    sitemap   the URL's sitemap <priority> (0.5 if it has none)
+    patterns  weight of the first matching line of a URL weights file
+
+Memory stays bounded: past ``max_entries`` queued URLs, the lower-scored
+half is spilled to a SQLite file. Spilled URLs keep being re-scored as
+in-links arrive, return to memory once they outrank everything on disk,
+and are otherwise read back once everything better has been fetched.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+import os
+import re
+import sqlite3
+import tempfile
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Iterable, Sequence
+
+from .frontier import _SQL_CHUNK, FrontierBackend
+from .lifecycle import FrontierItem
+
+
+@dataclass(slots=True)
+class Candidate:
+    """What a scorer knows about a queued URL."""
+
+    url: str
+    depth: int
+    inlinks: int = 0
+    sitemap_priority: float | None = None
+
+
+Scorer = Callable[[Candidate], float]
+
+
+def depth_scorer(c: Candidate) -> float:
+    """Prefer shallow pages."""
+    return -float(c.depth)
+
+
+def inlink_scorer(c: Candidate) -> float:
+    """Prefer URLs many crawled pages link to (log-scaled)."""
+    return math.log1p(c.inlinks)
+
+
+def sitemap_scorer(c: Candidate) -> float:
+    """A sitemap's <priority> for the URL; 0.5 (the protocol default) if
+    there is none."""
+    return 0.5 if c.sitemap_priority is None else c.sitemap_priority
+
+
+class UrlWeights:
+    """
+    URL-pattern weights, one ``weight regex`` pair per line (``#`` starts a
+    comment); a URL scores the weight of the first regex found in it, or 0.
+
+        5    /docs/
+        2    /guides?/
+        -10  /(tag|archive)/
+    """
+
+    def __init__(self, rules: Iterable[tuple[float, str]]):
+        self.rules = [(w, re.compile(p)) for w, p in rules]
+
+    def __call__(self, c: Candidate) -> float:
+        for weight, rx in self.rules:
+            if rx.search(c.url):
+                return weight
+        return 0.0
+
+    @classmethod
+    def parse(cls, lines: Iterable[str]) -> "UrlWeights":
+        """Build weights from text lines."""
+        rules: list[tuple[float, str]] = []
+        for lineno, raw in enumerate(lines, 1):
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            weight, _, pattern = line.partition(" ")
+            try:
+                rules.append((float(weight), pattern.strip()))
+                re.compile(pattern.strip())
+            except (ValueError, re.error) as exc:
+                msg = f"line {lineno}: bad weight {line!r}"
+                raise ValueError(msg) from exc
+        return cls(rules)
+
+    @classmethod
+    def load(cls, paths: Iterable[str]) -> "UrlWeights":
+        """Build weights from one or more files."""
+        lines: list[str] = []
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                lines.extend(f)
+        return cls.parse(lines)
+
+
+SCORERS: dict[str, Scorer] = {
+    "depth": depth_scorer,
+    "inlinks": inlink_scorer,
+    "sitemap": sitemap_scorer,
+}
+
+
+def build_scorer(spec: str, weights: UrlWeights | None = None) -> Scorer:
+    """
+    Combine scorers from a spec like ``"depth,inlinks:2,patterns"``: names
+    from SCORERS (or ``patterns`` for the URL weights), each with an
+    optional ``:weight`` (default 1).
+    """
+    parts: list[tuple[float, Scorer]] = []
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition(":")
+        if name == "patterns":
+            if weights is None:
+                raise ValueError("'patterns' scorer needs URL weights")
+            scorer: Scorer = weights
+        elif name in SCORERS:
+            scorer = SCORERS[name]
+        else:
+            raise ValueError(f"unknown scorer {name!r}")
+        parts.append((float(weight) if weight else 1.0, scorer))
+    if len(parts) == 1 and parts[0][0] == 1.0:
+        return parts[0][1]
+
+    def combined(c: Candidate) -> float:
+        return sum(w * s(c) for w, s in parts)
+
+    return combined
+
+
+@dataclass(slots=True)
+class _Entry:
+    depth: int
+    referrer: str | None
+    inlinks: int
+    sitemap: float | None
+    score: float
+    seq: int  # insertion order, breaks ties first-in-first-out
+
+
+class PriorityFrontier(FrontierBackend):
+    """Process-local frontier that pops the highest-scored URL first."""
+
+    def __init__(
+        self,
+        scorer: Scorer,
+        max_entries: int = 100_000,
+        spill_dir: str | None = None,
+    ):
+        if max_entries < 2:
+            raise ValueError("max_entries must be at least 2")
+        self.scorer = scorer
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self._seen: set[str] = set()
+        self._entries: dict[str, _Entry] = {}
+        # (-score, seq, url); stale tuples are skipped when popped.
+        self._heap: list[tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._hints: dict[str, float] = {}
+        self._popped = 0
+        self._db: sqlite3.Connection | None = None
+        self._spill_path: str | None = None
+        self._spilled = 0
+        self._spill_top = -math.inf  # best score on disk
+
+    def _score(self, url: str, e: _Entry) -> float:
+        return self.scorer(Candidate(url, e.depth, e.inlinks, e.sitemap))
+
+    def _push(self, url: str, e: _Entry) -> None:
+        self._entries[url] = e
+        heapq.heappush(self._heap, (-e.score, e.seq, url))
+
+    def hint(self, url: str, sitemap_priority: float) -> None:
+        self._hints[url] = sitemap_priority
+
+    async def add(self, items: Sequence[FrontierItem]) -> list[FrontierItem]:
+        seen = self._seen
+        added = []
+        to_disk: list[tuple[str, _Entry]] = []
+        for item in items:
+            url, depth, ref = item
+            if url in seen:
+                continue
+            seen.add(url)
+            added.append(item)
+            e = _Entry(
+                depth,
+                ref,
+                1 if ref else 0,
+                self._hints.pop(url, None),
+                0.0,
+                next(self._seq),
+            )
+            e.score = self._score(url, e)
+            if self._spilled and e.score < self._spill_top:
+                to_disk.append((url, e))  # keep memory to the best URLs
+            else:
+                self._push(url, e)
+        if to_disk:
+            self._spill(to_disk)
+        if len(self._entries) > self.max_entries:
+            self._spill_lowest()
+        return added
+
+    async def link_seen(self, urls: Iterable[str]) -> None:
+        entries = self._entries
+        on_disk = []
+        for url in urls:
+            e = entries.get(url)
+            if e is None:
+                on_disk.append(url)
+                continue
+            e.inlinks += 1
+            e.score = self._score(url, e)
+            heapq.heappush(self._heap, (-e.score, e.seq, url))
+        if self._spilled and on_disk:
+            self._rescore_spilled(on_disk)
+        if len(self._heap) > 2 * len(entries) + 64:
+            self._rebuild_heap()
+
+    async def mark_seen(self, urls: Iterable[str]) -> None:
+        self._seen.update(urls)
+
+    async def pop(self) -> FrontierItem | None:
+        heap, entries = self._heap, self._entries
+        while True:
+            while heap:
+                neg, _, url = heapq.heappop(heap)
+                e = entries.get(url)
+                if e is None or -neg != e.score:
+                    continue  # fetched already, or re-scored since
+                del entries[url]
+                self._popped += 1
+                return url, e.depth, e.referrer
+            if not self._spilled:
+                return None
+            self._refill()
+
+    async def done(self, url: str) -> None:
+        self._popped -= 1
+
+    async def pending(self) -> int:
+        return len(self._entries) + self._spilled + self._popped
+
+    async def release(self, items: Sequence[FrontierItem]) -> None:
+        for url, depth, ref in items:
+            e = _Entry(depth, ref, 0, None, 0.0, next(self._seq))
+            e.score = self._score(url, e)
+            self._push(url, e)
+        self._popped -= len(items)
+
+    def drain(self) -> list[FrontierItem]:
+        """Remove and return every queued item, best first."""
+        while self._spilled:
+            self._refill()
+        ranked = sorted(
+            self._entries.items(), key=lambda ue: (-ue[1].score, ue[1].seq)
+        )
+        self._entries.clear()
+        self._heap.clear()
+        return [(u, e.depth, e.referrer) for u, e in ranked]
+
+    async def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if self._spill_path and os.path.exists(self._spill_path):
+            os.remove(self._spill_path)
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(-e.score, e.seq, u) for u, e in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    def _open_spill(self) -> sqlite3.Connection:
+        if self._db is None:
+            fd, self._spill_path = tempfile.mkstemp(
+                prefix="frontier-spill-", suffix=".db", dir=self.spill_dir
+            )
+            os.close(fd)
+            self._db = sqlite3.connect(self._spill_path)
+            self._db.executescript(
+                """
+                PRAGMA journal_mode=OFF;
+                PRAGMA synchronous=OFF;
+                CREATE TABLE spill (
+                    url TEXT PRIMARY KEY, depth INTEGER, referrer TEXT,
+                    inlinks INTEGER, sitemap REAL, score REAL, seq INTEGER
+                );
+                CREATE INDEX spill_rank ON spill (score DESC, seq);
+                """
+            )
+        return self._db
+
+    def _spill(self, victims: list[tuple[str, _Entry]]) -> None:
+        db = self._open_spill()
+        with db:
+            db.executemany(
+                "INSERT INTO spill VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (u, e.depth, e.referrer, e.inlinks, e.sitemap)
+                    + (e.score, e.seq)
+                    for u, e in victims
+                ],
+            )
+        self._spilled += len(victims)
+        self._spill_top = max(
+            self._spill_top, max(e.score for _, e in victims)
+        )
+
+    def _spill_lowest(self) -> None:
+        entries = self._entries
+        victims = heapq.nsmallest(
+            len(entries) - self.max_entries // 2,
+            entries.items(),
+            key=lambda ue: (ue[1].score, -ue[1].seq),
+        )
+        for url, _ in victims:
+            del entries[url]
+        self._spill(victims)
+        self._rebuild_heap()
+
+    def _rescore_spilled(self, urls: list[str]) -> None:
+        # Re-score spilled URLs that gained an in-link; any that now beat
+        # everything left on disk move back into memory.
+        assert self._db is not None
+        db = self._db
+        counts = Counter(urls)
+        keys = list(counts)
+        updates = []
+        promoted = []
+        for i in range(0, len(keys), _SQL_CHUNK):
+            chunk = keys[i : i + _SQL_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            for url, depth, ref, inlinks, sitemap, seq in db.execute(
+                "SELECT url, depth, referrer, inlinks, sitemap, seq "
+                f"FROM spill WHERE url IN ({marks})",
+                chunk,
+            ).fetchall():
+                e = _Entry(
+                    depth, ref, inlinks + counts[url], sitemap, 0.0, seq
+                )
+                e.score = self._score(url, e)
+                if e.score > self._spill_top:
+                    promoted.append((url, e))
+                else:
+                    updates.append((e.inlinks, e.score, url))
+        with db:
+            db.executemany(
+                "UPDATE spill SET inlinks = ?, score = ? WHERE url = ?",
+                updates,
+            )
+            db.executemany(
+                "DELETE FROM spill WHERE url = ?", [(u,) for u, _ in promoted]
+            )
+        self._spilled -= len(promoted)
+        for url, e in promoted:
+            self._push(url, e)
+        if len(self._entries) > self.max_entries:
+            self._spill_lowest()
+
+    def _refill(self) -> None:
+        assert self._db is not None
+        db = self._db
+        rows = db.execute(
+            "SELECT url, depth, referrer, inlinks, sitemap, seq FROM spill "
+            "ORDER BY score DESC, seq LIMIT ?",
+            (self.max_entries // 2,),
+        ).fetchall()
+        with db:
+            db.executemany(
+                "DELETE FROM spill WHERE url = ?", [(r[0],) for r in rows]
+            )
+        self._spilled -= len(rows)
+        for url, depth, ref, inlinks, sitemap, seq in rows:
+            e = _Entry(depth, ref, inlinks, sitemap, 0.0, seq)
+            e.score = self._score(url, e)  # in-links may have grown on disk
+            self._push(url, e)
+        top = db.execute("SELECT MAX(score) FROM spill").fetchone()[0]
+        self._spill_top = -math.inf if top is None else top
@@ -0,0 +1,231 @@
+"""
+Retry support for the crawler: failure classification, exponential backoff
+with jitter, a delayed re-queue that does not hold worker slots, and a
+per-host circuit breaker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import random
+import socket
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Generic, TypeVar
+
+import aiohttp
+
+T = TypeVar("T")
+
+# Failure kinds
+DNS = "dns"
+CONNECT = "connect"
+TIMEOUT = "timeout"
+TLS = "tls"
+HTTP_429 = "http_429"
+HTTP_5XX = "http_5xx"
+INVALID = "invalid"
+OTHER = "other"
+
+TRANSIENT: frozenset[str] = frozenset(
+    {DNS, CONNECT, TIMEOUT, HTTP_429, HTTP_5XX}
+)
+
+
+def classify_exception(exc: BaseException) -> str:
+    """Map a fetch exception onto a failure kind."""
+    if isinstance(exc, (asyncio.TimeoutError, aiohttp.ServerTimeoutError)):
+        return TIMEOUT
+    if isinstance(exc, aiohttp.ClientSSLError):
+        return TLS
+    if isinstance(exc, aiohttp.ClientConnectorDNSError) or (
+        isinstance(exc, aiohttp.ClientConnectorError)
+        and isinstance(exc.os_error, socket.gaierror)
+    ):
+        return DNS
+    if isinstance(
+        exc, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+    ):
+        return CONNECT
+    if isinstance(exc, (aiohttp.InvalidURL, aiohttp.NonHttpUrlClientError)):
+        return INVALID
+    return OTHER
+
+
+def classify_status(status: int | None) -> str | None:
+    """Map an HTTP status onto a failure kind, or None if not a failure."""
+    if status == 429:
+        return HTTP_429
+    if status is not None and 500 <= status <= 599:
+        return HTTP_5XX
+    return None
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """How many times and how long to wait before refetching a URL."""
+
+    max_retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    jitter: float = 0.5  # fraction of the delay that is randomized
+    retry_on: frozenset[str] = TRANSIENT
+
+    def should_retry(self, kind: str | None, attempt: int) -> bool:
+        """True if a failure of this kind on this attempt is retried."""
+        return kind in self.retry_on and attempt < self.max_retries
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        """Delay before retry number ``attempt + 1`` (attempt is 0-based)."""
+        delay = min(self.max_delay, self.base_delay * (2**attempt))
+        delay *= 1.0 - self.jitter * random.random()
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class DelayedQueue(Generic[T]):
+    """
+    Holds items until their due time, then hands them to ``put``.
+
+    A single pump task sleeps until the earliest deadline, so waiting
+    retries cost no worker slot.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._heap: list[tuple[float, int, T]] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, item: T, delay: float) -> None:
+        """Release item after delay seconds."""
+        heapq.heappush(
+            self._heap, (self._clock() + delay, next(self._seq), item)
+        )
+        self._wakeup.set()
+
+    def drain(self) -> list[T]:
+        """Remove and return every waiting item, due or not."""
+        items = [item for _, _, item in sorted(self._heap)]
+        self._heap.clear()
+        return items
+
+    async def run(self, put: Callable[[T], Awaitable[None] | None]) -> None:
+        """Pump due items into ``put`` until cancelled."""
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            wait = self._heap[0][0] - self._clock()
+            if wait > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, _, item = heapq.heappop(self._heap)
+            res = put(item)
+            if res is not None:
+                await res
+
+
+@dataclass(slots=True)
+class _Breaker:
+    failures: int = 0
+    trips: int = 0
+    open_until: float = 0.0
+    probing: bool = False
+    probe_started: float = 0.0
+
+
+@dataclass
+class CircuitBreakers:
+    """
+    Per-host circuit breakers.
+
+    After ``threshold`` consecutive failures a host is opened for
+    ``cooldown`` seconds (doubling on each re-trip, up to ``max_cooldown``);
+    then a single probe request is let through. A probe that reports no
+    outcome within ``probe_timeout`` seconds is replaced by another. A host
+    that trips ``max_trips`` times in a row is considered dead.
+    """
+
+    threshold: int = 5
+    cooldown: float = 30.0
+    max_cooldown: float = 600.0
+    max_trips: int = 4
+    probe_timeout: float = 60.0
+    clock: Callable[[], float] = time.monotonic
+    _hosts: dict[str, _Breaker] = field(default_factory=dict)
+
+    def blocked_for(self, host: str) -> float | None:
+        """
+        Seconds to wait before a request to host may go out: 0 if allowed
+        now, None if the host is dead and its URLs should be dropped.
+        """
+        b = self._hosts.get(host)
+        if b is None or b.failures < self.threshold:
+            return 0.0
+        if b.trips >= self.max_trips:
+            return None
+        now = self.clock()
+        if now < b.open_until:
+            return b.open_until - now
+        if b.probing and now < b.probe_started + self.probe_timeout:
+            return min(self.cooldown, 1.0)
+        b.probing = True
+        b.probe_started = now
+        return 0.0
+
+    def record_success(self, host: str) -> None:
+        """Close the breaker for host."""
+        self._hosts.pop(host, None)
+
+    def record_failure(self, host: str) -> None:
+        """Count a failure for host, opening its breaker past threshold."""
+        b = self._hosts.setdefault(host, _Breaker())
+        b.failures += 1
+        if b.failures >= self.threshold and (b.probing or b.trips == 0):
+            b.probing = False
+            b.trips += 1
+            delay = min(self.max_cooldown, self.cooldown * 2 ** (b.trips - 1))
+            b.open_until = self.clock() + delay
+
+    def record_error(self, host: str) -> None:
+        """
+        Count a non-transient failure (TLS, invalid URL, ...) for host. It
+        fails an open probe; otherwise it says nothing about the host.
+        """
+        b = self._hosts.get(host)
+        if b is not None and b.probing:
+            self.record_failure(host)
+
+    def is_dead(self, host: str) -> bool:
+        """True if host has exhausted its trips."""
+        b = self._hosts.get(host)
+        return b is not None and b.trips >= self.max_trips
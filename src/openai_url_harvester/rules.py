@@ -0,0 +1,362 @@
+"""
+Compiled include/exclude rules for crawl scope.
+
+Rules are compiled once into structures whose per-URL cost does not grow
+with the number of rules: hash sets for hosts, host suffixes and query
+parameters, length-bucketed prefix sets for paths, and an Aho-Corasick
+automaton over the literal text each regex requires, so only regexes whose
+literal occurs in the URL are ever run.
+
+Rule file syntax, one rule per line (lines starting with ``#`` are
+comments)::
+
+    +host:*.openai.com     include subdomains of openai.com
+    +host:cookbook.openai.com
+    -host:cdn-*.openai.com glob (matched via the regex prefilter)
+    -path:/private/        path prefix
+    -url:openai.com/blog/  prefix of host + path
+    -re:\\.(pdf|zip)$       regular expression searched in the full URL
+    -query:sessionid       query parameter present
+    -query:sort=desc       query parameter with this value
+
+A URL is rejected if any ``-`` rule matches; if there are any ``+`` rules
+it must also match at least one of them.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Iterable
+from urllib.parse import SplitResult, parse_qsl, urlsplit
+
+_META = set(".^$*+?{}[]()|\\")
+
+
+def required_literal(pattern: str) -> str:
+    """
+    Return the longest literal that every match of ``pattern`` must
+    contain, or "" if none can be determined cheaply. Conservative: text
+    inside groups and classes, and anything near alternation, is ignored.
+    """
+    if "|" in pattern or pattern.startswith("(?"):
+        return ""
+    best = cur = ""
+    i, n = 0, len(pattern)
+
+    def flush() -> None:
+        nonlocal best, cur
+        if len(cur) > len(best):
+            best = cur
+        cur = ""
+
+    while i < n:
+        c = pattern[i]
+        if c == "\\":
+            nxt = pattern[i + 1] if i + 1 < n else ""
+            i += 2
+            if nxt and not nxt.isalnum():
+                cur += nxt  # escaped punctuation is a literal
+            elif nxt in "xuUN" or nxt.isdigit():
+                # \x2f, \u..., \N{...}, octal and backrefs run on past
+                # two chars; give up rather than misread their tail.
+                return ""
+            else:
+                flush()  # \d, \w, \b ...
+            continue
+        if c in "[(":
+            # Skip the class or (nested) group; its content is not required.
+            close = "]" if c == "[" else ")"
+            depth = 0
+            if c == "[":
+                i += 1
+                if pattern.startswith("^", i):
+                    i += 1
+                if pattern.startswith("]", i):
+                    i += 1  # "[]..." and "[^]...": this "]" is a member
+            while i < n:
+                ch = pattern[i]
+                if ch == "\\":
+                    i += 2
+                    continue
+                if ch == c and c == "(":
+                    depth += 1
+                elif ch == close:
+                    depth -= 1
+                    if c == "[" or depth == 0:
+                        i += 1
+                        break
+                i += 1
+            flush()
+            continue
+        if c in "*?{":
+            cur = cur[:-1]  # the preceding char is optional
+            flush()
+            if c == "{":
+                end = pattern.find("}", i)
+                i = n if end < 0 else end + 1
+            else:
+                i += 1
+            continue
+        if c in _META:
+            flush()  # ".", "^", "$", "+" end a literal run
+            i += 1
+            continue
+        cur += c
+        i += 1
+    flush()
+    return best
+
+
+class _LiteralIndex:
+    """Aho-Corasick automaton mapping literals to the rule ids using them."""
+
+    def __init__(self, literals: dict[str, list[int]]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._out: list[list[int]] = [[]]
+        for lit, ids in literals.items():
+            s = 0
+            for ch in lit:
+                nxt = self._goto[s].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._out.append([])
+                    self._goto[s][ch] = nxt
+                s = nxt
+            self._out[s].extend(ids)
+        self._fail = [0] * len(self._goto)
+        bfs = deque(self._goto[0].values())
+        while bfs:
+            s = bfs.popleft()
+            for ch, t in self._goto[s].items():
+                bfs.append(t)
+                f = self._fail[s]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[t] = self._goto[f].get(ch, 0)
+                self._out[t] = self._out[t] + self._out[self._fail[t]]
+
+    def candidates(self, text: str) -> set[int]:
+        """Ids of every rule whose literal occurs in text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set[int] = set()
+        s = 0
+        for ch in text:
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            if out[s]:
+                found.update(out[s])
+        return found
+
+
+class _RegexSet:
+    """Regexes searched in a string, prefiltered by their literals."""
+
+    def __init__(
+        self, patterns: list[str], literals_hint: list[str] | None = None
+    ):
+        self._regexes = [re.compile(p) for p in patterns]
+        literals: dict[str, list[int]] = {}
+        unfiltered: list[str] = []
+        for i, p in enumerate(patterns):
+            lit = literals_hint[i] if literals_hint else required_literal(p)
+            if lit:
+                literals.setdefault(lit, []).append(i)
+            else:
+                unfiltered.append(f"(?:{p})")
+        self._index = _LiteralIndex(literals) if literals else None
+        # Regexes without a usable literal are combined into one search.
+        self._rest = re.compile("|".join(unfiltered)) if unfiltered else None
+
+    def __bool__(self) -> bool:
+        return bool(self._regexes)
+
+    def search(self, text: str) -> bool:
+        """True if any regex matches somewhere in text."""
+        if self._rest is not None and self._rest.search(text):
+            return True
+        if self._index is not None:
+            for i in self._index.candidates(text):
+                if self._regexes[i].search(text):
+                    return True
+        return False
+
+
+class _PrefixSet:
+    """Prefix lookup bucketed by prefix length: one set probe per length."""
+
+    def __init__(self, prefixes: Iterable[str]):
+        buckets: dict[int, set[str]] = {}
+        for p in prefixes:
+            buckets.setdefault(len(p), set()).add(p)
+        self._buckets = sorted(buckets.items())
+
+    def __bool__(self) -> bool:
+        return bool(self._buckets)
+
+    def match(self, s: str) -> bool:
+        """True if any stored prefix is a prefix of s."""
+        n = len(s)
+        for length, bucket in self._buckets:
+            if length > n:
+                return False
+            if s[:length] in bucket:
+                return True
+        return False
+
+
+class _RuleGroup:
+    """All rules of one polarity, compiled."""
+
+    def __init__(self, rules: list[tuple[str, str]]):
+        hosts: set[str] = set()
+        suffixes: set[str] = set()
+        host_globs: list[str] = []
+        glob_literals: list[str] = []
+        paths: list[str] = []
+        urls: list[str] = []
+        regexes: list[str] = []
+        params: set[str] = set()
+        pairs: set[tuple[str, str]] = set()
+        for kind, value in rules:
+            if kind == "host":
+                value = value.lower()
+                if value.startswith("*.") and not _has_glob(value[2:]):
+                    suffixes.add(value[2:])
+                elif _has_glob(value):
+                    host_globs.append("^" + fnmatch.translate(value))
+                    glob_literals.append(_glob_literal(value))
+                else:
+                    hosts.add(value)
+            elif kind == "path":
+                paths.append(value)
+            elif kind == "url":
+                # Hosts compare lowercased, paths as written.
+                host, slash, path = value.split("://", 1)[-1].partition("/")
+                urls.append(host.lower() + slash + path)
+            elif kind == "re":
+                regexes.append(value)
+            elif kind == "query":
+                if "=" in value:
+                    k, v = value.split("=", 1)
+                    pairs.add((k, v))
+                else:
+                    params.add(value)
+        self.count = len(rules)
+        self._hosts = hosts
+        self._suffixes = suffixes
+        self._host_globs = _RegexSet(host_globs, glob_literals)
+        self._paths = _PrefixSet(paths)
+        self._urls = _PrefixSet(urls)
+        self._regexes = _RegexSet(regexes)
+        self._params = params
+        self._pairs = pairs
+
+    def matches(self, url: str, host: str, path: str, query: str) -> bool:
+        if host in self._hosts:
+            return True
+        if self._suffixes:
+            dot = host.find(".")
+            while dot >= 0:
+                if host[dot + 1 :] in self._suffixes:
+                    return True
+                dot = host.find(".", dot + 1)
+        if self._host_globs and self._host_globs.search(host):
+            return True
+        if self._paths and self._paths.match(path):
+            return True
+        if self._urls and self._urls.match(host + path):
+            return True
+        if self._regexes and self._regexes.search(url):
+            return True
+        if query and (self._params or self._pairs):
+            for k, v in parse_qsl(query, keep_blank_values=True):
+                if k in self._params or (k, v) in self._pairs:
+                    return True
+        return False
+
+
+def _has_glob(s: str) -> bool:
+    return any(c in s for c in "*?[")
+
+
+def _glob_literal(glob: str) -> str:
+    # Host globs for one site share their domain suffix, so the leading
+    # literal (e.g. "cdn-" in "cdn-*.example.com") is the selective one.
+    parts = re.split(r"\[[^\]]*\]|[*?]", glob)
+    if len(parts[0]) >= 2:
+        return parts[0]
+    return max(parts, key=len)
+
+
+class UrlRules:
+    """Compiled include/exclude URL rules (see module docstring)."""
+
+    KINDS = ("host", "path", "url", "re", "query")
+
+    def __init__(self, rules: Iterable[tuple[bool, str, str]]):
+        """rules: (include, kind, value) triples."""
+        inc: list[tuple[str, str]] = []
+        exc: list[tuple[str, str]] = []
+        for include, kind, value in rules:
+            if kind not in self.KINDS:
+                raise ValueError(f"unknown rule kind {kind!r}")
+            if kind == "re":
+                re.compile(value)  # fail early on bad patterns
+            (inc if include else exc).append((kind, value))
+        self._include = _RuleGroup(inc)
+        self._exclude = _RuleGroup(exc)
+
+    def __len__(self) -> int:
+        return self._include.count + self._exclude.count
+
+    @classmethod
+    def parse(cls, lines: Iterable[str]) -> "UrlRules":
+        """Build rules from text lines in the rule file syntax."""
+        rules: list[tuple[bool, str, str]] = []
+        for lineno, raw in enumerate(lines, 1):
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            sign, body = line[0], line[1:]
+            kind, sep, value = body.partition(":")
+            if sign not in "+-" or not sep or not value:
+                raise ValueError(f"line {lineno}: bad rule {raw.strip()!r}")
+            rules.append((sign == "+", kind.strip(), value.strip()))
+        return cls(rules)
+
+    @classmethod
+    def load(cls, paths: Iterable[str]) -> "UrlRules":
+        """Build rules from one or more rule files."""
+        lines: list[str] = []
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                lines.extend(f)
+        return cls.parse(lines)
+
+    def allows(self, url: str) -> bool:
+        """True if url is in scope."""
+        return self.allows_split(url, urlsplit(url))
+
+    def allows_split(self, url: str, parts: SplitResult) -> bool:
+        """allows() for a URL the caller has already split."""
+        host = _hostname(parts.netloc)
+        path = parts.path or "/"
+        if self._exclude.count and self._exclude.matches(
+            url, host, path, parts.query
+        ):
+            return False
+        if self._include.count:
+            return self._include.matches(url, host, path, parts.query)
+        return True
+
+
+@lru_cache(maxsize=4096)
+def _hostname(netloc: str) -> str:
+    # Links mostly point at a handful of hosts; SplitResult.hostname
+    # re-parses the netloc on every access.
+    return (urlsplit("//" + netloc).hostname or "").lower()
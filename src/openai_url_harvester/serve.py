@@ -0,0 +1,232 @@
+"""
+Persistent job server for openai_url_harvester.
+
+``serve`` keeps one warm process (dependencies imported once) that runs
+crawl/extract jobs submitted over a local socket; ``submit`` is the
+lightweight client. Jobs write files as the server's user, so only that
+user may submit them: the default is a Unix socket with mode 0600 in a
+private directory, and TCP (for platforms without Unix sockets) is only
+served on loopback addresses. The protocol is one JSON line each way:
+
+    request:  {"argv": ["extract", "--path", "docs", ...], "cwd": "/work"}
+    response: {"ok": true, "message": "Wrote 12 URLs to /work/urls.txt"}
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import ipaddress
+import json
+import os
+import socket
+import stat
+import sys
+import tempfile
+from typing import Any
+
+JOB_COMMANDS = ("crawl", "extract")
+DEFAULT_PORT = 8765
+UNIX_SOCKETS = hasattr(socket, "AF_UNIX") and sys.platform != "win32"
+
+
+def default_socket_path() -> str:
+    """Per-user socket path: under $XDG_RUNTIME_DIR, else a private tmp dir."""
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        base = os.path.join(runtime, "openai_url_harvester")
+    else:
+        base = os.path.join(
+            tempfile.gettempdir(), f"openai_url_harvester-{os.getuid()}"
+        )
+    return os.path.join(base, "serve.sock")
+
+
+def endpoint(
+    host: str, port: int | None, socket_path: str | None
+) -> tuple[str, int, str | None]:
+    """
+    Resolve the CLI's --host/--port/--socket into (host, port, socket_path):
+    an explicit socket, TCP if a port is given, else the default socket
+    (TCP on DEFAULT_PORT where Unix sockets are unavailable).
+    """
+    if socket_path is None and port is None and UNIX_SOCKETS:
+        socket_path = default_socket_path()
+    return host, DEFAULT_PORT if port is None else port, socket_path
+
+
+def check_loopback(host: str) -> None:
+    """Raise ValueError unless every address of host is a loopback one."""
+    try:
+        infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+    except socket.gaierror as exc:
+        raise ValueError(f"cannot resolve {host}: {exc}") from exc
+    for info in infos:
+        addr = ipaddress.ip_address(str(info[4][0]).split("%")[0])
+        if not addr.is_loopback:
+            msg = (
+                f"refusing to serve jobs on non-loopback host {host}: "
+                "jobs are unauthenticated and write files as this user"
+            )
+            raise ValueError(msg)
+
+
+def _private_dir(path: str) -> None:
+    """Create path's directory as 0700, refusing one others can enter."""
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, mode=0o700, exist_ok=True)
+    st = os.stat(parent)
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise ValueError(f"{parent} must be private to this user (0700)")
+
+
+def _bind_unix(path: str) -> socket.socket:
+    """
+    Bind a 0600 Unix socket at path. A stale socket from a server that
+    died is replaced; a live server's socket, or any other file, is not.
+    """
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        pass
+    else:
+        if not stat.S_ISSOCK(st.st_mode):
+            raise ValueError(f"{path} exists and is not a socket")
+        with socket.socket(socket.AF_UNIX) as probe:
+            try:
+                probe.connect(path)
+            except ConnectionRefusedError:
+                os.remove(path)
+            else:
+                raise ValueError(f"a server is already listening on {path}")
+    sock = socket.socket(socket.AF_UNIX)
+    # Create the socket as 0600 outright; chmod afterwards would race.
+    umask = os.umask(0o177)
+    try:
+        # Unlike start_unix_server(path=...), bind never replaces a socket
+        # that appeared since the check above.
+        sock.bind(path)
+    except OSError as exc:
+        sock.close()
+        raise ValueError(f"cannot bind {path}: {exc}") from exc
+    finally:
+        os.umask(umask)
+    return sock
+
+
+async def run_job(parser: argparse.ArgumentParser, req: dict) -> dict:
+    """Run one submitted job and return the response object."""
+    from .__main__ import crawl_job, extract_job, resolve_paths
+
+    argv = req.get("argv")
+    if not isinstance(argv, list) or not argv or argv[0] not in JOB_COMMANDS:
+        return {"ok": False, "error": f"job must start with {JOB_COMMANDS}"}
+    usage = io.StringIO()
+    try:
+        # Parsing is synchronous, so redirecting stderr cannot leak into
+        # another job's output.
+        with contextlib.redirect_stderr(usage):
+            args = parser.parse_args([str(a) for a in argv])
+    except SystemExit:
+        return {"ok": False, "error": usage.getvalue().strip()}
+    resolve_paths(args, str(req.get("cwd") or os.getcwd()))
+    try:
+        if args.cmd == "crawl":
+            message = await crawl_job(args, handle_signals=False)
+        else:
+            message = await asyncio.to_thread(extract_job, args)
+    except Exception as exc:  # pylint: disable=broad-except
+        return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+    return {"ok": True, "message": message}
+
+
+async def _serve(host: str, port: int, sock: socket.socket | None) -> None:
+    from .__main__ import build_parser
+    from .extract import preload
+    from .lifecycle import stop_on_signals
+    from . import crawl  # noqa: F401  # warm the crawler's dependencies
+
+    preload()
+    parser = build_parser()
+
+    async def handle(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            line = await reader.readline()
+            try:
+                req = json.loads(line)
+            except ValueError:
+                resp: dict[str, Any] = {"ok": False, "error": "bad request"}
+            else:
+                resp = await run_job(parser, req)
+            writer.write(json.dumps(resp).encode("utf-8") + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    if sock is not None:
+        server = await asyncio.start_unix_server(handle, sock=sock)
+        where = sock.getsockname()
+    else:
+        server = await asyncio.start_server(handle, host, port)
+        where = f"{host}:{port}"
+    print(f"Serving jobs on {where}", file=sys.stderr)
+
+    stop = asyncio.Event()
+    with stop_on_signals(stop):
+        await stop.wait()
+    server.close()
+    await server.wait_closed()
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int | None = None,
+    socket_path: str | None = None,
+) -> None:
+    """
+    Run the job server until SIGINT/SIGTERM. Raises ValueError for a
+    non-loopback host, a socket directory other users can enter, or a
+    socket path another server is listening on.
+    """
+    host, port, socket_path = endpoint(host, port, socket_path)
+    if not socket_path:
+        check_loopback(host)
+        asyncio.run(_serve(host, port, None))
+        return
+    _private_dir(socket_path)
+    sock = _bind_unix(socket_path)
+    ino = os.stat(socket_path).st_ino
+    try:
+        asyncio.run(_serve(host, port, sock))
+    finally:
+        # Remove only our own socket, not one that replaced it.
+        with contextlib.suppress(FileNotFoundError):
+            if os.stat(socket_path).st_ino == ino:
+                os.remove(socket_path)
+
+
+def submit(
+    argv: list[str],
+    host: str = "127.0.0.1",
+    port: int | None = None,
+    socket_path: str | None = None,
+) -> tuple[bool, str]:
+    """Send a job to a running server; return (ok, message)."""
+    host, port, socket_path = endpoint(host, port, socket_path)
+    req = json.dumps({"argv": argv, "cwd": os.getcwd()}).encode("utf-8")
+    if socket_path:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(socket_path)
+    else:
+        sock = socket.create_connection((host, port))
+    with sock, sock.makefile("rb") as f:
+        sock.sendall(req + b"\n")
+        line = f.readline()
+    resp = json.loads(line or b"{}")
+    if resp.get("ok"):
+        return True, resp.get("message", "")
+    return False, resp.get("error", "no response from server")
@@ -1,16 +1,28 @@
 """
 Sitemap utilities for generating XML sitemaps and sitemap indexes.
-Provides functions to write sitemaps and optionally gzip the output.
+Provides functions to write sitemaps and optionally gzip the output, and an
+incremental reader for (optionally gzipped) sitemaps and sitemap indexes.
 """
 
 from __future__ import annotations
 
 import gzip
 import os
+import zlib
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Iterable
+from typing import Iterable, Mapping, cast
 from xml.dom import minidom
-from xml.etree.ElementTree import Element, SubElement, tostring
+from xml.etree.ElementTree import (
+    Element,
+    ParseError,
+    SubElement,
+    XMLPullParser,
+    tostring,
+)
+
+# Protocol limit for one uncompressed sitemap file.
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
 
 
 def _write_bytes(path: str, data: bytes, gzip_output: bool) -> str:
@@ -25,16 +37,23 @@ def _write_bytes(path: str, data: bytes, gzip_output: bool) -> str:
     return path
 
 
-def write_sitemap(urls: Iterable[str]) -> bytes:
-    """Return a UTF-8 XML sitemap document for the given URLs."""
+def write_sitemap(
+    urls: Iterable[str], lastmod: Mapping[str, str] | None = None
+) -> bytes:
+    """
+    Return a UTF-8 XML sitemap document for the given URLs.
+
+    lastmod maps URLs to their W3C <lastmod>; others get today's date.
+    """
     urlset = Element(
         "urlset", xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
     )
     now = datetime.now(timezone.utc).date().isoformat()
+    lastmod = lastmod or {}
     for u in urls:
         uel = SubElement(urlset, "url")
         SubElement(uel, "loc").text = u
-        SubElement(uel, "lastmod").text = now
+        SubElement(uel, "lastmod").text = lastmod.get(u, now)
     xml_bytes = tostring(urlset, encoding="utf-8")
     return minidom.parseString(xml_bytes).toprettyxml(
         indent="  ", encoding="utf-8"
@@ -65,6 +84,7 @@ def write_sitemap_auto(
     out_path: str,
     max_urls: int = 50_000,
     gzip_output: bool = False,
+    lastmod: Mapping[str, str] | None = None,
 ) -> list[str]:
     """
     Write a single sitemap or a sitemap
@@ -75,7 +95,7 @@ def write_sitemap_auto(
     os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
 
     if len(urls) <= max_urls:
-        data = write_sitemap(urls)
+        data = write_sitemap(urls, lastmod)
         path = _write_bytes(out_path, data, gzip_output)
         return [path]
 
@@ -91,7 +111,7 @@ def write_sitemap_auto(
         urls = urls[max_urls:]
         part += 1
         part_path = f"{base}_{part}{ext}"
-        data = write_sitemap(chunk)
+        data = write_sitemap(chunk, lastmod)
         written_path = _write_bytes(part_path, data, gzip_output)
         written.append(written_path)
 
@@ -104,6 +124,107 @@ def write_sitemap_auto(
     return written
 
 
+@dataclass(slots=True)
+class SitemapEntry:
+    """A <url> or <sitemap> entry read from a sitemap document."""
+
+    loc: str
+    lastmod: str | None = None
+    priority: float | None = None
+    is_index: bool = False  # True for <sitemap> entries of an index
+
+
+class SitemapReader:
+    """
+    Incremental sitemap parser: feed raw (optionally gzipped) bytes as they
+    arrive and collect entries as each element closes, so large sitemaps
+    never have to be held in memory.
+    """
+
+    def __init__(self, max_bytes: int = MAX_SITEMAP_BYTES):
+        self.max_bytes = max_bytes
+        self._parser: XMLPullParser[Element] = XMLPullParser(
+            events=("end",)
+        )
+        self._inflate: zlib._Decompress | None = None
+        self._started = False
+        self._size = 0
+
+    def feed(self, chunk: bytes) -> list[SitemapEntry]:
+        """Feed bytes; return entries completed so far."""
+        if not self._started and chunk:
+            self._started = True
+            if chunk[:2] == b"\x1f\x8b":
+                self._inflate = zlib.decompressobj(wbits=31)
+        if self._inflate is not None:
+            chunk = self._inflate.decompress(chunk)
+        self._size += len(chunk)
+        if self._size > self.max_bytes:
+            raise ValueError("sitemap exceeds size limit")
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> list[SitemapEntry]:
+        """Finish parsing; return any remaining entries."""
+        if self._inflate is not None:
+            self._parser.feed(self._inflate.flush())
+        try:
+            self._parser.close()
+        except ParseError:
+            pass
+        return self._drain()
+
+    def _drain(self) -> list[SitemapEntry]:
+        entries: list[SitemapEntry] = []
+        for event in self._parser.read_events():
+            el = cast(Element, event[-1])  # "end" events carry the element
+            tag = el.tag.rsplit("}", 1)[-1]
+            if tag not in ("url", "sitemap"):
+                continue
+            fields = {
+                c.tag.rsplit("}", 1)[-1]: (c.text or "").strip() for c in el
+            }
+            el.clear()
+            loc = fields.get("loc")
+            if not loc:
+                continue
+            try:
+                priority = float(fields["priority"])
+            except (KeyError, ValueError):
+                priority = None
+            entries.append(
+                SitemapEntry(
+                    loc=loc,
+                    lastmod=fields.get("lastmod") or None,
+                    priority=priority,
+                    is_index=tag == "sitemap",
+                )
+            )
+        return entries
+
+
+def read_sitemap(data: bytes) -> list[SitemapEntry]:
+    """Parse a complete (optionally gzipped) sitemap document."""
+    reader = SitemapReader()
+    return reader.feed(data) + reader.close()
+
+
+def parse_lastmod(value: str | None) -> datetime | None:
+    """Parse a W3C datetime <lastmod> into an aware UTC datetime."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
 def utcnow():
     """Return the current UTC datetime (timezone-aware)."""
     return datetime.now(timezone.utc)
@@ -0,0 +1,123 @@
+"""
+Per-URL crawl state carried between runs so a recrawl can skip pages that
+have not changed since they were last fetched, revisit each page on its own
+adaptive schedule, and report what changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime, timedelta
+
+STATE_VERSION = 2
+
+DAY = 86400.0
+
+
+@dataclass(slots=True)
+class UrlState:
+    """What the previous run knew about one URL."""
+
+    lastmod: str | None = None  # sitemap <lastmod> at the last fetch
+    fetched_at: str | None = None  # ISO timestamp of the last fetch
+    changed_at: str | None = None  # ISO timestamp content last changed
+    content_hash: str | None = None  # content_hash() of the page text
+    etag: str | None = None
+    last_modified: str | None = None  # Last-Modified response header
+    depth: int | None = None
+    revisit: float | None = None  # seconds until the page is due again
+
+    def is_due(self, now: datetime) -> bool:
+        """True if the page's revisit interval has elapsed at ``now``."""
+        if not self.fetched_at or not self.revisit:
+            return True
+        last = datetime.fromisoformat(self.fetched_at)
+        return now >= last + timedelta(seconds=self.revisit)
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for refetching the page."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass(frozen=True, slots=True)
+class RevisitPolicy:
+    """
+    Adaptive revisit intervals: halve a page's interval each time it is
+    found changed, double it each time it is not, within [minimum, maximum].
+    """
+
+    initial: float = DAY
+    minimum: float = 3600.0
+    maximum: float = 30 * DAY
+
+    def next_interval(self, prev: UrlState | None, changed: bool) -> float:
+        """Interval to store after a fetch."""
+        if prev is None or not prev.revisit:
+            return self.initial
+        if changed:
+            return max(self.minimum, prev.revisit / 2)
+        return min(self.maximum, prev.revisit * 2)
+
+
+@dataclass
+class CrawlDiff:
+    """URLs added, changed, and removed relative to the previous run."""
+
+    added: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+    def save(self, path: str) -> None:
+        """Write the diff as JSON with sorted URL lists."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {k: sorted(v) for k, v in asdict(self).items()},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+
+def content_hash(text: str) -> str:
+    """Stable digest of page text used to detect content changes."""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+
+def load_state(path: str | None) -> dict[str, UrlState]:
+    """Load crawl state written by save_state; empty if there is none."""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    known = {f.name for f in fields(UrlState)}
+    return {
+        url: UrlState(**{k: v for k, v in entry.items() if k in known})
+        for url, entry in data.get("urls", {}).items()
+    }
+
+
+def save_state(path: str, state: dict[str, UrlState]) -> None:
+    """Atomically write crawl state as JSON."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": STATE_VERSION,
+                "urls": {u: asdict(state[u]) for u in sorted(state)},
+            },
+            f,
+            ensure_ascii=False,
+            indent=1,
+        )
+    os.replace(tmp, path)
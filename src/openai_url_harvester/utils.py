@@ -9,6 +9,8 @@ from html import unescape
 from urllib.parse import urljoin, urldefrag, urlparse
 import os
 
+DEFAULT_UA = "openai-url-harvester/0.7 (+https://example.invalid)"
+
 OK_CONTENT_TYPES: tuple[str, ...] = (
     "text/html",
     "application/xhtml+xml",
@@ -22,6 +24,8 @@ def norm_url(base: str, href: str | None) -> str | None:
     href = unescape(href.strip())
     abs_u = urljoin(base, href)
     abs_u, _ = urldefrag(abs_u)
+    if abs_u.startswith(("http://", "https://")):
+        return abs_u  # the common case, without another full parse
     p = urlparse(abs_u)
     if p.scheme not in ("http", "https"):
         return None
@@ -38,5 +42,10 @@ def host_ok(host: str, allow_hosts: set[str]) -> bool:
 
 def is_probably_html(url: str) -> bool:
     """Heuristic: keep URLs with no extension or common HTML ones."""
-    ext = os.path.splitext(urlparse(url).path)[1].lower()
+    return is_html_path(urlparse(url).path)
+
+
+def is_html_path(path: str) -> bool:
+    """is_probably_html for an already split-off URL path."""
+    ext = os.path.splitext(path)[1].lower()
     return ext in ("", ".html", ".htm", ".xhtml")
@@ -0,0 +1,103 @@
+"""
+Tests for CLI start-up cost and the persistent serve/submit mode.
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import socket
+import stat
+import subprocess
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+ENV = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+
+
+def test_cli_import_is_lazy() -> None:
+    """Importing the CLI loads none of the heavy dependencies."""
+    code = (
+        "import sys, openai_url_harvester.__main__; "
+        "print(' '.join(sorted({m.split('.')[0] for m in sys.modules})))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=ENV,
+    ).stdout.split()
+    for heavy in ("aiohttp", "bs4", "chardet", "pdfminer", "asyncio"):
+        assert heavy not in out
+
+
+def test_serve_runs_submitted_extract(tmp_path: pathlib.Path) -> None:
+    """
+    A submitted job runs in the server with the client's cwd; the socket
+    is private to the user, is not taken over by a second server, and TCP
+    is refused off loopback.
+    """
+    sock_path = str(tmp_path / "serve.sock")
+    work = tmp_path / "work"
+    work.mkdir()
+    (work / "page.html").write_text(
+        '<a href="https://example.com/a">a</a>', encoding="utf-8"
+    )
+    cli = [sys.executable, "-m", "openai_url_harvester"]
+    server = subprocess.Popen(
+        cli + ["serve", "--socket", sock_path],
+        env=ENV,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                with socket.socket(socket.AF_UNIX) as s:
+                    s.connect(sock_path)
+                break
+            except OSError:
+                assert time.monotonic() < deadline, "server did not start"
+                time.sleep(0.05)
+        assert stat.S_IMODE(os.stat(sock_path).st_mode) == 0o600
+        submit = cli + ["submit", "--socket", sock_path]
+        subprocess.run(
+            submit
+            + ["--", "extract", "--path", "page.html"]
+            + ["--out", "urls.txt"],
+            cwd=work,
+            env=ENV,
+            check=True,
+        )
+        bad = subprocess.run(
+            submit + ["--", "extract"], cwd=work, env=ENV
+        )
+        second = subprocess.run(
+            cli + ["serve", "--socket", sock_path],
+            env=ENV,
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        assert second.returncode == 1
+        assert "already listening" in second.stderr
+        assert os.path.exists(sock_path)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    assert not os.path.exists(sock_path)
+    urls = (work / "urls.txt").read_text(encoding="utf-8").split()
+    assert urls == ["https://example.com/a"]
+    assert bad.returncode == 1
+
+    public = subprocess.run(
+        cli + ["serve", "--host", "0.0.0.0", "--port", "0"],
+        env=ENV,
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+    assert public.returncode == 1
+    assert "non-loopback" in public.stderr
@@ -14,6 +14,8 @@ import subprocess
 import sys
 import threading
 
+import pytest
+
 
 def test_crawler_smoke(tmp_path: pathlib.Path) -> None:
     """
@@ -142,3 +144,327 @@ def test_crawler_smoke(tmp_path: pathlib.Path) -> None:
     # Verify outputs were written
     assert out.exists(), f"Expected output file {out} to be created"
     assert details.exists(), f"Expected details file {details} to be created"
+
+
+def test_crawler_budget_and_checkpoint(tmp_path: pathlib.Path) -> None:
+    """
+    max_pages is exact under high concurrency, the crawl returns as soon as
+    the budget is spent, and the checkpoint resumes the remaining frontier.
+    """
+    import asyncio
+    import time
+
+    site_dir = tmp_path / "site"
+    site_dir.mkdir()
+    links = "".join(f'<a href="/p{i}.html">{i}</a>' for i in range(20))
+    (site_dir / "index.html").write_text(
+        f"<html><body>{links}</body></html>", encoding="utf-8"
+    )
+    for i in range(20):
+        (site_dir / f"p{i}.html").write_text(
+            f"<html><body><p>page number {i} unique text {i * 7}</p>"
+            "</body></html>",
+            encoding="utf-8",
+        )
+
+    Handler = functools.partial(
+        http.server.SimpleHTTPRequestHandler, directory=str(site_dir)
+    )
+    repo_root = pathlib.Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(repo_root / "src"))
+    from openai_url_harvester.crawl import run_crawl
+
+    out = tmp_path / "urls.txt"
+    checkpoint = tmp_path / "frontier.json"
+
+    with socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler) as httpd:
+        httpd.daemon_threads = True
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        start_url = f"http://127.0.0.1:{httpd.server_address[1]}/"
+
+        def crawl(max_pages: int) -> list[str]:
+            return asyncio.run(
+                run_crawl(
+                    start_urls=[start_url],
+                    allow_hosts=set(),
+                    max_pages=max_pages,
+                    max_depth=None,
+                    concurrency=10,
+                    per_host_qps=1000.0,
+                    delay=0.0,
+                    user_agent="test-agent",
+                    request_timeout=15,
+                    respect_robots=False,
+                    include_assets=False,
+                    out_path=str(out),
+                    details_path=None,
+                    cache_html_dir=None,
+                    export_json_path=None,
+                    sitemap_out=None,
+                    sitemap_max_urls=50000,
+                    sitemap_gzip=False,
+                    checkpoint_path=str(checkpoint),
+                )
+            )
+
+        try:
+            t0 = time.monotonic()
+            first = crawl(5)
+            elapsed = time.monotonic() - t0
+            assert len(first) == 5
+            assert elapsed < 1.0, "crawl should end without idle polling"
+            assert checkpoint.exists()
+
+            second = crawl(30)
+            assert set(first) <= set(second)
+            assert len(second) == 21
+            assert not checkpoint.exists(), "completed crawl clears checkpoint"
+        finally:
+            httpd.shutdown()
+            thread.join(timeout=1.0)
+
+
+def test_spent_budget_stops_popping(tmp_path: pathlib.Path) -> None:
+    """
+    Once max_pages is reserved, workers wait for the last fetches instead
+    of popping (and checkpointing back) the rest of the frontier.
+    """
+    import asyncio
+
+    site_dir = tmp_path / "site"
+    site_dir.mkdir()
+    links = "".join(f'<a href="/p{i}.html">{i}</a>' for i in range(500))
+    (site_dir / "index.html").write_text(
+        f"<html><body>{links}</body></html>", encoding="utf-8"
+    )
+    for i in range(500):
+        (site_dir / f"p{i}.html").write_text(
+            f"<html><body><p>page {i} text {i * 7}</p></body></html>",
+            encoding="utf-8",
+        )
+
+    Handler = functools.partial(
+        http.server.SimpleHTTPRequestHandler, directory=str(site_dir)
+    )
+    repo_root = pathlib.Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(repo_root / "src"))
+    from openai_url_harvester import CrawlConfig, Crawler
+    from openai_url_harvester.frontier import MemoryFrontier
+    from openai_url_harvester.lifecycle import FrontierItem
+
+    class CountingFrontier(MemoryFrontier):
+        pops = 0
+
+        async def pop(self) -> FrontierItem | None:
+            item = await super().pop()
+            if item is not None:
+                self.pops += 1
+            return item
+
+    frontier = CountingFrontier()
+
+    with socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler) as httpd:
+        httpd.daemon_threads = True
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        crawler = Crawler(
+            CrawlConfig(
+                start_urls=[f"http://127.0.0.1:{httpd.server_address[1]}/"],
+                max_pages=5,
+                concurrency=4,
+                per_host_qps=1000.0,
+                delay=0.0,
+                respect_robots=False,
+                near_dup_distance=None,
+            ),
+            frontier=frontier,
+        )
+        try:
+            asyncio.run(crawler.run())
+        finally:
+            httpd.shutdown()
+            thread.join(timeout=1.0)
+
+    assert crawler.stop_reason == "budget"
+    assert len(crawler.visited) == 5
+    assert frontier.pops <= 5 + 4
+
+
+def test_crawler_stream_hooks(tmp_path: pathlib.Path) -> None:
+    """
+    Crawler.stream() yields pages while crawling, honours the filter and
+    scorer hooks, and stops the crawl cleanly (checkpoint and state saved)
+    when the consumer leaves early.
+    """
+    import asyncio
+    import contextlib
+
+    site_dir = tmp_path / "site"
+    site_dir.mkdir()
+    links = "".join(f'<a href="/p{i}.html">{i}</a>' for i in range(10))
+    (site_dir / "index.html").write_text(
+        f"<html><body>{links}</body></html>", encoding="utf-8"
+    )
+    for i in range(10):
+        (site_dir / f"p{i}.html").write_text(
+            f"<html><body><p>page {i} has text {i * 13}</p></body></html>",
+            encoding="utf-8",
+        )
+
+    Handler = functools.partial(
+        http.server.SimpleHTTPRequestHandler, directory=str(site_dir)
+    )
+    repo_root = pathlib.Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(repo_root / "src"))
+    from openai_url_harvester import CrawlConfig, Crawler, CrawlPage
+
+    with socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler) as httpd:
+        httpd.daemon_threads = True
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{httpd.server_address[1]}"
+
+        def score(url: str, page: CrawlPage) -> float | None:
+            n = int(url.rsplit("/p", 1)[1].split(".")[0])
+            return None if n >= 8 else float(n)
+
+        stored: list[str] = []
+        crawler = Crawler(
+            CrawlConfig(
+                start_urls=[base + "/"],
+                concurrency=1,
+                per_host_qps=1000.0,
+                delay=0.0,
+                respect_robots=False,
+                checkpoint_path=str(tmp_path / "frontier.json"),
+                state_path=str(tmp_path / "state.json"),
+            ),
+            url_filter=lambda u: not u.endswith("/p0.html"),
+            on_page=lambda page: stored.append(page.url),
+            link_scorer=score,
+        )
+
+        async def consume() -> list[CrawlPage]:
+            pages: list[CrawlPage] = []
+            async with contextlib.aclosing(crawler.stream()) as stream:
+                async for page in stream:
+                    pages.append(page)
+                    if len(pages) == 3:
+                        break
+            return pages
+
+        try:
+            pages = asyncio.run(consume())
+        finally:
+            httpd.shutdown()
+            thread.join(timeout=1.0)
+
+    assert pages[0].url == base + "/"
+    assert pages[0].links == [f"{base}/p{i}.html" for i in range(7, 0, -1)]
+    assert [p.url for p in pages[1:]] == [base + "/p7.html", base + "/p6.html"]
+    assert stored[:3] == [p.url for p in pages]
+    assert crawler.stop_reason == "closed"
+    assert (tmp_path / "frontier.json").exists()
+    assert (tmp_path / "state.json").exists()
+
+
+def test_crawler_hook_error_stops_crawl(tmp_path: pathlib.Path) -> None:
+    """
+    An exception from a hook stops the crawl, which still checkpoints its
+    frontier, and is raised to the caller instead of hanging the crawl.
+    """
+    import asyncio
+
+    site_dir = tmp_path / "site"
+    site_dir.mkdir()
+    links = "".join(f'<a href="/p{i}.html">{i}</a>' for i in range(10))
+    (site_dir / "index.html").write_text(
+        f"<html><body>{links}</body></html>", encoding="utf-8"
+    )
+    for i in range(10):
+        (site_dir / f"p{i}.html").write_text(
+            f"<html><body><p>page {i} has text {i * 13}</p></body></html>",
+            encoding="utf-8",
+        )
+
+    Handler = functools.partial(
+        http.server.SimpleHTTPRequestHandler, directory=str(site_dir)
+    )
+    repo_root = pathlib.Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(repo_root / "src"))
+    from openai_url_harvester import CrawlConfig, Crawler, CrawlPage
+
+    checkpoint = tmp_path / "frontier.json"
+
+    def store(page: CrawlPage) -> None:
+        if page.url.endswith("/p3.html"):
+            raise OSError("disk full")
+
+    with socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler) as httpd:
+        httpd.daemon_threads = True
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        crawler = Crawler(
+            CrawlConfig(
+                start_urls=[f"http://127.0.0.1:{httpd.server_address[1]}/"],
+                concurrency=2,
+                per_host_qps=1000.0,
+                delay=0.0,
+                respect_robots=False,
+                checkpoint_path=str(checkpoint),
+            ),
+            on_page=store,
+        )
+        try:
+            with pytest.raises(OSError, match="disk full"):
+                asyncio.run(asyncio.wait_for(crawler.run(), timeout=5.0))
+        finally:
+            httpd.shutdown()
+            thread.join(timeout=1.0)
+
+    assert crawler.stop_reason == "error"
+    assert checkpoint.exists()
+
+
+def test_admit_batch_matches_per_link_checks() -> None:
+    """
+    The batched link filter keeps exactly the links the per-link checks
+    keep, in page order, with in-page repeats and seen URLs dropped.
+    """
+    repo_root = pathlib.Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(repo_root / "src"))
+    from openai_url_harvester import CrawlConfig, Crawler
+    from openai_url_harvester.rules import UrlRules
+    from openai_url_harvester.utils import is_probably_html
+
+    crawler = Crawler(
+        CrawlConfig(
+            start_urls=[],
+            allow_hosts={"example.com"},
+            max_depth=2,
+            rules=UrlRules.parse(["-path:/private/"]),
+        ),
+        url_filter=lambda u: "skip" not in u,
+    )
+    crawler.enqueued.add("https://www.example.com/seen")
+    links = [
+        "https://www.example.com/a",
+        "https://other.org/b",
+        "https://www.example.com/private/c",
+        "https://www.example.com/a",
+        "https://example.com/logo.png",
+        "https://www.example.com/seen",
+        "https://EXAMPLE.com/skip",
+        "https://EXAMPLE.com/d.html",
+    ]
+    expected = [
+        u
+        for u in dict.fromkeys(links)
+        if is_probably_html(u) and crawler._wanted(u, 2)
+    ]
+    assert crawler._admit(links, 2) == expected == [
+        "https://www.example.com/a",
+        "https://EXAMPLE.com/d.html",
+    ]
+    assert crawler._admit(links, 3) == []
@@ -0,0 +1,45 @@
+"""
+Tests for near-duplicate detection used to prune crawler traps.
+"""
+
+from __future__ import annotations
+
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from openai_url_harvester.dedup import (  # noqa: E402
+    DuplicateTracker,
+    SimHashIndex,
+    hamming,
+    simhash,
+    url_pattern,
+)
+
+BODY = " ".join(f"word{i} lorem ipsum dolor" for i in range(200))
+
+
+def test_simhash_near_duplicates_are_close() -> None:
+    """A small edit keeps fingerprints close; unrelated text does not."""
+    a = simhash(BODY)
+    b = simhash(BODY + " session 12345")
+    c = simhash(" ".join(f"other{i} text here" for i in range(200)))
+    assert hamming(a, b) <= 3
+    assert hamming(a, c) > 3
+
+    idx = SimHashIndex(max_distance=3)
+    idx.add(a, "https://x.test/a")
+    assert idx.find(b) == "https://x.test/a"
+    assert idx.find(c) is None
+
+
+def test_tracker_flags_trap_patterns() -> None:
+    """Calendar-style URLs returning the same page get flagged."""
+    t = DuplicateTracker(min_duplicates=3)
+    assert t.observe("https://x.test/cal?d=1", BODY) is None
+    for d in range(2, 6):
+        assert t.observe(f"https://x.test/cal?d={d}", BODY)
+    assert t.is_trap("https://x.test/cal?d=99")
+    assert not t.is_trap("https://x.test/about")
+    assert url_pattern("https://x.test/p/2024/07") == "x.test/p/{n}/{n}"
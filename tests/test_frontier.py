@@ -0,0 +1,350 @@
+"""
+Tests for the frontier backends, host leases, and multi-node crawls.
+The Redis backend runs against a small in-process RESP server.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import http.server
+import pathlib
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from openai_url_harvester.frontier import (  # noqa: E402
+    FrontierBackend,
+    MemoryFrontier,
+    RedisFrontier,
+    RespClient,
+    SqliteFrontier,
+)
+
+
+class FakeRedis:
+    """Just enough of a Redis server for RedisFrontier."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+        self.expires: dict[str, float] = {}
+
+    def _get(self, key: str, factory: Callable[[], Any]) -> Any:
+        if key in self.expires and self.expires[key] <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        if key not in self.data:
+            self.data[key] = factory()
+        return self.data[key]
+
+    def _exists(self, key: str) -> bool:
+        return self._get(key, lambda: None) is not None
+
+    def run(self, cmd: str, *a: str) -> Any:
+        if cmd == "SELECT":
+            return "OK"
+        if cmd == "SADD":
+            s = self._get(a[0], set)
+            n = len(s)
+            s.update(a[1:])
+            return len(s) - n
+        if cmd == "SMEMBERS":
+            return sorted(self._get(a[0], set))
+        if cmd in ("RPUSH", "LPUSH"):
+            q = self._get(a[0], deque)
+            for v in a[1:]:
+                (q.append if cmd == "RPUSH" else q.appendleft)(v)
+            return len(q)
+        if cmd == "LPOP":
+            q = self._get(a[0], deque)
+            return q.popleft() if q else None
+        if cmd == "HSET":
+            self._get(a[0], dict)[a[1]] = a[2]
+            return 1
+        if cmd == "HDEL":
+            return int(self._get(a[0], dict).pop(a[1], None) is not None)
+        if cmd == "HGETALL":
+            return [x for kv in self._get(a[0], dict).items() for x in kv]
+        if cmd == "SET":
+            key, value, opts = a[0], a[1], [o.upper() for o in a[2:]]
+            if "NX" in opts and self._exists(key):
+                return None
+            self.data[key] = value
+            self.expires.pop(key, None)
+            if "PX" in opts:
+                ms = int(a[2 + opts.index("PX") + 1])
+                self.expires[key] = time.monotonic() + ms / 1000
+            return "OK"
+        if cmd == "GET":
+            v = self._get(a[0], lambda: None)
+            return None if v is None else str(v)
+        if cmd == "MGET":
+            return [self.run("GET", k) for k in a]
+        if cmd == "DEL":
+            return sum(self.data.pop(k, None) is not None for k in a)
+        if cmd == "PEXPIRE":
+            if not self._exists(a[0]):
+                return 0
+            self.expires[a[0]] = time.monotonic() + int(a[1]) / 1000
+            return 1
+        if cmd in ("INCRBY", "DECR"):
+            by = int(a[1]) if cmd == "INCRBY" else -1
+            self.data[a[0]] = int(self._get(a[0], int)) + by
+            return self.data[a[0]]
+        raise ValueError(cmd)
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            args = []
+            for _ in range(int(line[1:])):
+                n = int((await reader.readline())[1:])
+                args.append((await reader.readexactly(n + 2))[:-2].decode())
+            writer.write(_reply(self.run(args[0].upper(), *args[1:])))
+            await writer.drain()
+        writer.close()
+
+
+def _reply(v: Any) -> bytes:
+    if v is None:
+        return b"$-1\r\n"
+    if isinstance(v, int):
+        return b":%d\r\n" % v
+    if isinstance(v, list):
+        return b"*%d\r\n" % len(v) + b"".join(_reply(x) for x in v)
+    b = str(v).encode()
+    return b"$%d\r\n%s\r\n" % (len(b), b)
+
+
+@pytest.fixture
+def redis_port() -> Any:
+    """Run a FakeRedis on a background loop; yield its port."""
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(
+        asyncio.start_server(FakeRedis().handle, "127.0.0.1", 0)
+    )
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield server.sockets[0].getsockname()[1]
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=1.0)
+
+
+def _factory(kind: str, tmp_path: pathlib.Path, port: int | None) -> Any:
+    def make(node: str, ttl: float = 30.0) -> FrontierBackend:
+        if kind == "memory":
+            return MemoryFrontier()
+        if kind == "sqlite":
+            return SqliteFrontier(
+                str(tmp_path / "f.db"), node_id=node, lease_ttl=ttl
+            )
+        assert port is not None
+        return RedisFrontier(
+            RespClient("127.0.0.1", port), node_id=node, lease_ttl=ttl
+        )
+
+    return make
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite", "redis"])
+def test_frontier_contract(
+    kind: str, tmp_path: pathlib.Path, request: pytest.FixtureRequest
+) -> None:
+    """Seen-set, FIFO pops, pending accounting and release."""
+    port = request.getfixturevalue("redis_port") if kind == "redis" else None
+    make = _factory(kind, tmp_path, port)
+
+    async def scenario() -> None:
+        f = make("a")
+        a, b, c = (f"http://h/{x}" for x in "abc")
+        assert await f.add([(a, 0, None), (b, 1, a)]) == [
+            (a, 0, None),
+            (b, 1, a),
+        ]
+        await f.mark_seen([c])
+        assert await f.add([(a, 0, None), (c, 1, a)]) == []
+        assert await f.pending() == 2
+        assert await f.pop() == (a, 0, None)
+        assert await f.pop() == (b, 1, a)
+        assert await f.pop() is None
+        await f.done(a)
+        assert await f.pending() == 1
+        await f.release([(b, 1, a)])
+        assert await f.pending() == 1
+        assert await f.pop() == (b, 1, a)
+        await f.done(b)
+        assert await f.pending() == 0
+        await f.close()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("kind", ["sqlite", "redis"])
+def test_host_leases(
+    kind: str, tmp_path: pathlib.Path, request: pytest.FixtureRequest
+) -> None:
+    """
+    A host is served to one node at a time; when that node stops renewing
+    its lease another node takes the host and its in-flight URLs over.
+    """
+    port = request.getfixturevalue("redis_port") if kind == "redis" else None
+    make = _factory(kind, tmp_path, port)
+
+    async def scenario() -> None:
+        a, b = make("a", ttl=0.2), make("b", ttl=0.2)
+        await a.add([("http://x/1", 0, None), ("http://x/2", 0, None)])
+        await a.add([("http://y/1", 0, None)])
+        assert await a.pop() == ("http://x/1", 0, None)
+        assert await b.pop() == ("http://y/1", 0, None)
+        assert await b.pop() is None  # x is leased to a
+        assert await a.pop() == ("http://x/2", 0, None)
+
+        # a dies holding x with two URLs in flight.
+        await asyncio.sleep(0.3)
+        got = {await b.pop(), await b.pop()}
+        assert got == {("http://x/1", 0, None), ("http://x/2", 0, None)}
+        for url in ("http://y/1", "http://x/1", "http://x/2"):
+            await b.done(url)
+        assert await b.pending() == 0
+        await a.close()
+        await b.close()
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def site(tmp_path: pathlib.Path) -> Any:
+    """Serve a 30-page site; yield its base URL."""
+    site_dir = tmp_path / "site"
+    site_dir.mkdir()
+    links = "".join(f'<a href="/p{i}.html">{i}</a>' for i in range(30))
+    (site_dir / "index.html").write_text(
+        f"<html><body>{links}</body></html>", encoding="utf-8"
+    )
+    for i in range(30):
+        (site_dir / f"p{i}.html").write_text(
+            f"<html><body><p>page {i} text {i * 11} {links}</p></body></html>",
+            encoding="utf-8",
+        )
+    Handler = functools.partial(
+        http.server.SimpleHTTPRequestHandler, directory=str(site_dir)
+    )
+    with socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler) as httpd:
+        httpd.daemon_threads = True
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{httpd.server_address[1]}"
+        httpd.shutdown()
+        thread.join(timeout=1.0)
+
+
+def test_two_nodes_share_a_crawl(tmp_path: pathlib.Path, site: str) -> None:
+    """
+    Two nodes on one SQLite frontier fetch every page exactly once between
+    them, never share a host, both stop when the shared frontier drains,
+    and their outputs merge into the full crawl.
+    """
+    from openai_url_harvester import CrawlConfig, Crawler
+    from openai_url_harvester.merge import merge_outputs
+
+    db = f"sqlite:///{tmp_path / 'frontier.db'}"
+
+    def node(name: str) -> Crawler:
+        return Crawler(
+            CrawlConfig(
+                # Two host names for one server: two hosts to lease.
+                start_urls=[site, site.replace("127.0.0.1", "localhost")],
+                concurrency=4,
+                per_host_qps=1000.0,
+                delay=0.0,
+                respect_robots=False,
+                near_dup_distance=None,
+                frontier=db,
+                node_id=name,
+            )
+        )
+
+    async def both() -> list[Crawler]:
+        nodes = [node("a"), node("b")]
+        await asyncio.gather(*(n.run() for n in nodes))
+        return nodes
+
+    a, b = asyncio.run(both())
+    assert a.stop_reason == b.stop_reason == "drained"
+    assert not a.visited & b.visited
+    assert len(a.visited | b.visited) == 62
+    for host in ("127.0.0.1", "localhost"):
+        owners = [n for n in (a, b) if any(host in u for u in n.visited)]
+        assert len(owners) == 1
+
+    outs = []
+    for n, name in ((a, "a"), (b, "b")):
+        path = tmp_path / f"urls-{name}.txt"
+        path.write_text("\n".join(sorted(n.visited)), encoding="utf-8")
+        outs.append(str(path))
+    merged = merge_outputs(outs, str(tmp_path / "urls.txt"))
+    assert merged == sorted(a.visited | b.visited)
+
+
+def test_spent_node_leaves_shared_queue(
+    tmp_path: pathlib.Path, site: str
+) -> None:
+    """
+    A node whose budget runs out stops popping, so it neither claims the
+    shared queue nor holds host leases while its last fetches finish; the
+    other node crawls the rest.
+    """
+    from openai_url_harvester import CrawlConfig, Crawler
+    from openai_url_harvester.lifecycle import FrontierItem
+
+    db = str(tmp_path / "frontier.db")
+
+    class CountingFrontier(SqliteFrontier):
+        pops = 0
+
+        async def pop(self) -> FrontierItem | None:
+            item = await super().pop()
+            if item is not None:
+                self.pops += 1
+            return item
+
+    counted = CountingFrontier(db, node_id="a")
+
+    def node(name: str, max_pages: int) -> Crawler:
+        return Crawler(
+            CrawlConfig(
+                start_urls=[site, site.replace("127.0.0.1", "localhost")],
+                max_pages=max_pages,
+                concurrency=4,
+                per_host_qps=1000.0,
+                delay=0.0,
+                respect_robots=False,
+                near_dup_distance=None,
+                frontier=f"sqlite:///{db}",
+                node_id=name,
+            ),
+            frontier=counted if name == "a" else None,
+        )
+
+    async def both() -> list[Crawler]:
+        nodes = [node("a", 3), node("b", 1000)]
+        await asyncio.gather(*(n.run() for n in nodes))
+        return nodes
+
+    a, b = asyncio.run(both())
+    asyncio.run(counted.close())
+    assert a.stop_reason == "budget" and len(a.visited) == 3
+    assert counted.pops <= 3 + 4
+    assert b.stop_reason == "drained"
+    assert len(a.visited | b.visited) == 62
@@ -0,0 +1,161 @@
+"""
+Tests for the best-first frontier: scorers, in-link updates, spilling to
+disk, and budget use in a crawl.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import http.server
+import pathlib
+import socketserver
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from openai_url_harvester.priority import (  # noqa: E402
+    Candidate,
+    PriorityFrontier,
+    UrlWeights,
+    build_scorer,
+    depth_scorer,
+)
+
+
+def test_build_scorer() -> None:
+    """Specs combine named scorers as a weighted sum."""
+    weights = UrlWeights.parse(["# docs first", "5 /docs/", "-1 /blog/"])
+    score = build_scorer("depth,inlinks:0,sitemap:2,patterns", weights)
+    c = Candidate("https://x/docs/a", depth=2, inlinks=9, sitemap_priority=1)
+    assert score(c) == pytest.approx(-2 + 2 * 1 + 5)
+    assert build_scorer("depth") is depth_scorer
+    with pytest.raises(ValueError):
+        build_scorer("pagerank")
+    with pytest.raises(ValueError):
+        build_scorer("patterns")
+    with pytest.raises(ValueError):
+        UrlWeights.parse(["heavy /docs/"])
+
+
+def test_priority_order_and_inlinks() -> None:
+    """Pops best-first, FIFO on ties, and in-links re-rank queued URLs."""
+
+    async def scenario() -> list[str]:
+        f = PriorityFrontier(build_scorer("depth,inlinks"))
+        await f.add([("a", 2, "r"), ("b", 1, "r"), ("c", 1, "r")])
+        await f.add([("b", 1, "r")])  # already seen
+        await f.link_seen(["a", "a", "a", "a", "a", "a", "a", "a"])
+        order = []
+        while (item := await f.pop()) is not None:
+            order.append(item[0])
+            await f.done(item[0])
+        assert await f.pending() == 0
+        return order
+
+    # a: -2 + log(10) beats b and c: -1 + log(2)
+    assert asyncio.run(scenario()) == ["a", "b", "c"]
+
+
+def test_spill_keeps_best_first(tmp_path: pathlib.Path) -> None:
+    """
+    With little memory, low scorers spill to disk and come back in order;
+    drain returns spilled entries too.
+    """
+
+    async def scenario() -> tuple[list[int], list[int]]:
+        f = PriorityFrontier(
+            lambda c: float(c.url), max_entries=10, spill_dir=str(tmp_path)
+        )
+        values = [(i * 37) % 101 for i in range(101)]
+        await f.add([(str(v), 0, None) for v in values])
+        assert len(f._entries) <= 10 and f._spilled > 0
+        await f.add([(str(v), 0, None) for v in (150, -5)])
+        popped = []
+        for _ in range(50):
+            item = await f.pop()
+            assert item is not None
+            popped.append(int(item[0]))
+        rest = [int(u) for u, _, _ in f.drain()]
+        await f.close()
+        return popped, rest
+
+    popped, rest = asyncio.run(scenario())
+    assert popped == [150] + list(range(100, 51, -1))
+    assert rest == list(range(51, -1, -1)) + [-5]
+    assert not list(tmp_path.iterdir()), "spill file is removed on close"
+
+
+def test_priority_spends_budget_on_linked_pages(
+    tmp_path: pathlib.Path,
+) -> None:
+    """
+    Under a fixed budget the in-link scorer fetches the page every section
+    links to before any section's own leaf; FIFO runs out of budget first.
+    """
+    from openai_url_harvester import CrawlConfig, Crawler
+
+    site_dir = tmp_path / "site"
+    site_dir.mkdir()
+    sections = "".join(f'<a href="/s{i}.html">s{i}</a>' for i in range(6))
+    (site_dir / "index.html").write_text(
+        f"<html><body>{sections}</body></html>", encoding="utf-8"
+    )
+    for i in range(6):
+        (site_dir / f"s{i}.html").write_text(
+            f'<html><body><p>section {i} body {i * 17}</p>'
+            f'<a href="/leaf{i}.html">leaf</a>'
+            '<a href="/key.html">key</a></body></html>',
+            encoding="utf-8",
+        )
+        (site_dir / f"leaf{i}.html").write_text(
+            f"<html><body><p>leaf {i} words {i * 29}</p></body></html>",
+            encoding="utf-8",
+        )
+    (site_dir / "key.html").write_text(
+        "<html><body><p>the key page</p></body></html>", encoding="utf-8"
+    )
+    Handler = functools.partial(
+        http.server.SimpleHTTPRequestHandler, directory=str(site_dir)
+    )
+
+    def crawl(base: str, priority: str | None) -> list[str]:
+        crawler = Crawler(
+            CrawlConfig(
+                start_urls=[base + "/"],
+                max_pages=8,
+                concurrency=1,
+                per_host_qps=1000.0,
+                delay=0.0,
+                respect_robots=False,
+                priority=build_scorer(priority) if priority else None,
+            )
+        )
+        order: list[str] = []
+
+        async def run() -> None:
+            async for page in crawler.stream():
+                order.append(page.url.rsplit("/", 1)[1])
+
+        asyncio.run(run())
+        return order
+
+    with socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler) as httpd:
+        httpd.daemon_threads = True
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{httpd.server_address[1]}"
+        try:
+            fifo = crawl(base, None)
+            best = crawl(base, "depth,inlinks:2")
+        finally:
+            httpd.shutdown()
+            thread.join(timeout=1.0)
+
+    assert "key.html" not in fifo
+    assert "key.html" in best
+    leaves = [i for i, u in enumerate(best) if u.startswith("leaf")]
+    assert all(best.index("key.html") < i for i in leaves)
@@ -0,0 +1,99 @@
+"""
+Tests for retry classification, backoff, and per-host circuit breakers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from openai_url_harvester.retry import (  # noqa: E402
+    HTTP_429,
+    HTTP_5XX,
+    TIMEOUT,
+    CircuitBreakers,
+    DelayedQueue,
+    RetryPolicy,
+    classify_exception,
+    classify_status,
+)
+
+
+def test_classification_and_backoff() -> None:
+    """Statuses and exceptions map to kinds; backoff grows and is capped."""
+    assert classify_status(503) == HTTP_5XX
+    assert classify_status(429) == HTTP_429
+    assert classify_status(404) is None
+    assert classify_exception(asyncio.TimeoutError()) == TIMEOUT
+
+    policy = RetryPolicy(max_retries=2, base_delay=1.0, max_delay=4.0)
+    assert policy.should_retry(HTTP_5XX, 1)
+    assert not policy.should_retry(HTTP_5XX, 2)
+    assert not policy.should_retry(None, 0)
+    assert 0.5 <= policy.backoff(0) <= 1.0
+    assert policy.backoff(10) <= 4.0
+    assert policy.backoff(0, retry_after=3.0) == 3.0
+
+
+def test_circuit_breaker_opens_probes_and_dies() -> None:
+    """A failing host is paused, probed once, and eventually dropped."""
+    now = [0.0]
+    cb = CircuitBreakers(threshold=2, cooldown=10.0, max_trips=2)
+    cb.clock = lambda: now[0]
+    cb.record_failure("h")
+    assert cb.blocked_for("h") == 0.0
+    cb.record_failure("h")
+    assert cb.blocked_for("h") == 10.0
+    now[0] = 10.0
+    assert cb.blocked_for("h") == 0.0  # the probe
+    assert cb.blocked_for("h") == 1.0  # others wait for the probe
+    cb.record_failure("h")
+    assert cb.blocked_for("h") is None
+    cb.record_success("h")
+    assert cb.blocked_for("h") == 0.0
+
+
+def test_circuit_breaker_probe_always_settles() -> None:
+    """
+    A probe ending in a non-transient error counts as a failed probe, and
+    a probe that never reports back is replaced after probe_timeout.
+    """
+    now = [0.0]
+    cb = CircuitBreakers(
+        threshold=1, cooldown=10.0, max_trips=3, probe_timeout=30.0
+    )
+    cb.clock = lambda: now[0]
+    cb.record_error("h")  # not probing: ignored
+    assert cb.blocked_for("h") == 0.0
+    cb.record_failure("h")
+    now[0] = 10.0
+    assert cb.blocked_for("h") == 0.0
+    cb.record_error("h")  # e.g. TLS on the probe
+    assert cb.blocked_for("h") == 20.0
+    now[0] = 30.0
+    assert cb.blocked_for("h") == 0.0  # this probe is dropped unreported
+    now[0] = 59.0
+    assert cb.blocked_for("h") == 1.0
+    now[0] = 10_000.0
+    assert cb.blocked_for("h") == 0.0  # a fresh probe
+    cb.record_success("h")
+    assert cb.blocked_for("h") == 0.0
+
+
+def test_delayed_queue_releases_in_due_order() -> None:
+    """Items come out of the pump ordered by their deadlines."""
+
+    async def go() -> list[str]:
+        out: list[str] = []
+        dq: DelayedQueue[str] = DelayedQueue()
+        pump = asyncio.create_task(dq.run(out.append))
+        dq.schedule("late", 0.05)
+        dq.schedule("early", 0.01)
+        await asyncio.sleep(0.1)
+        pump.cancel()
+        return out
+
+    assert asyncio.run(go()) == ["early", "late"]
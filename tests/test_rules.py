@@ -0,0 +1,81 @@
+"""
+Tests for compiled include/exclude URL rules.
+"""
+
+from __future__ import annotations
+
+import pathlib
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from openai_url_harvester.rules import (  # noqa: E402
+    UrlRules,
+    required_literal,
+)
+
+RULES = """
+# scope
++host:*.openai.com
++host:example.org
+-host:cdn-*.openai.com
+-path:/private/
+-url:platform.openai.com/blog/
+-url:Example.org/API/
+-re:\\.(pdf|zip)$
+-re:/v\\d+/old/
+-query:sessionid
+-query:sort=desc
+"""
+
+
+@pytest.mark.parametrize(
+    "url, allowed",
+    [
+        ("https://platform.openai.com/docs", True),
+        ("https://example.org/?sort=asc", True),
+        ("https://openai.com/", False),  # *. only matches subdomains
+        ("https://other.com/", False),  # no include rule matches
+        ("https://cdn-1.openai.com/a", False),
+        ("https://a.openai.com/private/x", False),
+        ("https://platform.openai.com/blog/post", False),
+        ("https://example.org/API/x", False),
+        ("https://example.org/api/x", True),  # paths are case-sensitive
+        ("https://example.org/file.pdf", False),
+        ("https://example.org/v2/old/x", False),
+        ("https://example.org/?sessionid=1", False),
+        ("https://example.org/?sort=desc", False),
+    ],
+)
+def test_rules_scope(url: str, allowed: bool) -> None:
+    """Excludes win; with include rules present one of them must match."""
+    rules = UrlRules.parse(RULES.splitlines())
+    assert len(rules) == 10
+    assert rules.allows(url) is allowed
+
+
+def test_required_literal_is_conservative() -> None:
+    """Only text every match must contain is used for prefiltering."""
+    assert required_literal(r"/docs/v\d+/api") == "/docs/v"
+    assert required_literal(r"colou?r") == "colo"
+    assert required_literal(r"\.pdf$") == ".pdf"
+    assert required_literal(r"abc|xyz") == ""
+    assert required_literal(r"(ab)+cd") == "cd"
+    assert required_literal(r"[]abcd]x") == "x"
+    assert required_literal(r"[^]abcd]xy") == "xy"
+    assert not UrlRules.parse([r"-re:[]abcd]x"]).allows("https://e.com/]x")
+    escapes = (r"\x2fprivate", r"\101bc", r"\u00e9t\xe9", r"\N{EM DASH}x")
+    for pattern in escapes:
+        assert required_literal(pattern) == ""
+    rules = UrlRules.parse([r"-re:\x2fprivate/"])
+    assert not rules.allows("https://a.com/private/x")
+
+
+def test_bad_rules_are_rejected() -> None:
+    """Malformed lines and unknown kinds fail at compile time."""
+    with pytest.raises(ValueError):
+        UrlRules.parse(["host:example.com"])
+    with pytest.raises(ValueError):
+        UrlRules.parse(["-colour:red"])
@@ -0,0 +1,147 @@
+"""
+Tests for sitemap reading and sitemap-seeded crawling.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import gzip
+import http.server
+import pathlib
+import socketserver
+import sys
+import threading
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from openai_url_harvester.crawl import CrawlConfig, Crawler  # noqa: E402
+from openai_url_harvester.sitemap import (  # noqa: E402
+    SitemapReader,
+    read_sitemap,
+    write_sitemap,
+)
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def test_reader_handles_gzip_and_chunks() -> None:
+    """Entries come out of gzipped documents fed a few bytes at a time."""
+    locs = ["https://x.test/a", "https://x.test/b"]
+    data = gzip.compress(write_sitemap(locs))
+    reader = SitemapReader()
+    entries = []
+    for i in range(0, len(data), 7):
+        entries += reader.feed(data[i : i + 7])
+    entries += reader.close()
+    assert [e.loc for e in entries] == locs
+    assert all(e.lastmod and not e.is_index for e in entries)
+
+    idx = read_sitemap(
+        f"<sitemapindex {NS}><sitemap><loc>https://x.test/s1.xml</loc>"
+        "</sitemap></sitemapindex>".encode()
+    )
+    assert idx[0].is_index and idx[0].loc == "https://x.test/s1.xml"
+
+
+def test_sitemap_seeding_skips_unchanged(tmp_path: pathlib.Path) -> None:
+    """Robots-listed sitemaps seed the crawl; a recrawl skips unchanged."""
+    site = tmp_path / "site"
+    site.mkdir()
+    (site / "index.html").write_text("<html><body>home</body></html>")
+    urls = "".join(
+        f"<url><loc>{{base}}/p{i}.html</loc><lastmod>2024-01-0{i + 1}"
+        "</lastmod></url>"
+        for i in range(3)
+    )
+    for i in range(3):
+        (site / f"p{i}.html").write_text(f"<html><body>p {i}</body></html>")
+
+    Handler = functools.partial(
+        http.server.SimpleHTTPRequestHandler, directory=str(site)
+    )
+    with socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler) as httpd:
+        httpd.daemon_threads = True
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{httpd.server_address[1]}"
+        (site / "robots.txt").write_text(f"Sitemap: {base}/index.xml\n")
+        (site / "index.xml").write_text(
+            f"<sitemapindex {NS}><sitemap><loc>{base}/part.xml.gz</loc>"
+            "</sitemap></sitemapindex>"
+        )
+        part = f"<urlset {NS}>{urls}</urlset>".format(base=base)
+        (site / "part.xml.gz").write_bytes(gzip.compress(part.encode()))
+
+        def crawl() -> tuple[list[str], Crawler]:
+            crawler = Crawler(
+                CrawlConfig(
+                    start_urls=[base + "/"],
+                    per_host_qps=1000.0,
+                    delay=0.0,
+                    sitemaps=True,
+                    state_path=str(tmp_path / "state.json"),
+                )
+            )
+
+            async def go() -> list[str]:
+                return [p.url async for p in crawler.stream()]
+
+            return asyncio.run(go()), crawler
+
+        try:
+            first, _ = crawl()
+            second, crawler = crawl()
+        finally:
+            httpd.shutdown()
+            thread.join(timeout=1.0)
+
+    pages = {f"{base}/p{i}.html" for i in range(3)}
+    assert pages <= set(first)
+    assert second == [base + "/"]
+    assert crawler.unchanged == pages
+
+
+def test_time_budget_covers_sitemap_seeding(tmp_path: pathlib.Path) -> None:
+    """A slow sitemap is cut off by the time budget, not waited out."""
+    import time
+
+    site = tmp_path / "site"
+    site.mkdir()
+    (site / "index.html").write_text("<html><body>home</body></html>")
+
+    class SlowSitemaps(http.server.SimpleHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.endswith(".xml"):
+                time.sleep(3.0)
+            super().do_GET()
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    Handler = functools.partial(SlowSitemaps, directory=str(site))
+    with socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler) as httpd:
+        httpd.daemon_threads = True
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{httpd.server_address[1]}"
+        (site / "robots.txt").write_text(f"Sitemap: {base}/slow.xml\n")
+        crawler = Crawler(
+            CrawlConfig(
+                start_urls=[base + "/"],
+                per_host_qps=1000.0,
+                delay=0.0,
+                sitemaps=True,
+                time_budget=0.5,
+            )
+        )
+        try:
+            t0 = time.monotonic()
+            asyncio.run(crawler.run())
+            elapsed = time.monotonic() - t0
+        finally:
+            httpd.shutdown()
+            thread.join(timeout=1.0)
+
+    assert crawler.stop_reason == "time"
+    assert elapsed < 2.0
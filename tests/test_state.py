@@ -0,0 +1,96 @@
+"""
+Tests for incremental recrawls driven by saved crawl state.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import http.server
+import json
+import os
+import pathlib
+import socketserver
+import sys
+import threading
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from openai_url_harvester.crawl import CrawlConfig, Crawler  # noqa: E402
+from openai_url_harvester.state import (  # noqa: E402
+    RevisitPolicy,
+    UrlState,
+    load_state,
+)
+
+
+def test_revisit_policy_adapts() -> None:
+    """Intervals shrink for changing pages and grow for stable ones."""
+    policy = RevisitPolicy(initial=100.0, minimum=30.0, maximum=300.0)
+    assert policy.next_interval(None, True) == 100.0
+    assert policy.next_interval(UrlState(revisit=100.0), True) == 50.0
+    assert policy.next_interval(UrlState(revisit=40.0), True) == 30.0
+    assert policy.next_interval(UrlState(revisit=200.0), False) == 300.0
+
+
+def test_recrawl_reports_diff(tmp_path: pathlib.Path) -> None:
+    """A recrawl refetches due pages conditionally and emits a diff."""
+    site = tmp_path / "site"
+    site.mkdir()
+    (site / "index.html").write_text(
+        '<a href="/a.html">a</a> <a href="/b.html">b</a>', encoding="utf-8"
+    )
+    (site / "a.html").write_text("<p>first version</p>", encoding="utf-8")
+    (site / "b.html").write_text("<p>soon gone</p>", encoding="utf-8")
+    state = tmp_path / "state.json"
+
+    Handler = functools.partial(
+        http.server.SimpleHTTPRequestHandler, directory=str(site)
+    )
+    with socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler) as httpd:
+        httpd.daemon_threads = True
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{httpd.server_address[1]}"
+
+        def crawl(policy: RevisitPolicy) -> Crawler:
+            crawler = Crawler(
+                CrawlConfig(
+                    start_urls=[base + "/"],
+                    per_host_qps=1000.0,
+                    delay=0.0,
+                    respect_robots=False,
+                    state_path=str(state),
+                    recrawl=True,
+                    revisit=policy,
+                )
+            )
+            asyncio.run(crawler.run())
+            return crawler
+
+        try:
+            # A zero interval makes every page due on the next run.
+            first = crawl(RevisitPolicy(initial=0.0))
+            (site / "a.html").write_text("<p>second</p>", encoding="utf-8")
+            later = time.time() + 5
+            os.utime(site / "a.html", (later, later))
+            (site / "b.html").unlink()
+            second = crawl(RevisitPolicy())
+            third = crawl(RevisitPolicy())
+        finally:
+            httpd.shutdown()
+            thread.join(timeout=1.0)
+
+    pages = [base + "/", base + "/a.html", base + "/b.html"]
+    assert sorted(first.diff.added) == pages
+    assert second.diff.added == []
+    assert second.diff.changed == [base + "/a.html"]
+    assert second.diff.removed == [base + "/b.html"]
+
+    saved = load_state(str(state))
+    assert sorted(saved) == pages[:2]
+    assert json.loads(state.read_text())["version"] == 2
+    # Nothing is due under the default schedule except the start URL.
+    assert third.visited == {base + "/"}
+    assert third.unchanged == {base + "/a.html"}